@@ -1,13 +1,44 @@
 import os
-from flask import Flask, request, render_template, redirect, url_for, flash
+import math
+import zlib
+from flask import Flask, request, render_template, redirect, url_for, flash, jsonify
+from flask import Blueprint, current_app
 from flask_sqlalchemy import SQLAlchemy
-from flask_migrate import Migrate
-from werkzeug.utils import secure_filename
-import fitz
-from functions import *
-import shutil
+from sqlalchemy import event
+from functions import (
+    MODEL_NAME,
+    QUALIFICATION_TYPES,
+    VETERAN_BONUS,
+    build_instructions,
+    estimate_cost,
+    preprocess_resume,
+    score_verdicts,
+)
+from ingestion import iter_uploaded_pdfs, MAX_ZIP_MEMBER_BYTES
+from export import EXPORT_FORMATS, stream_csv, write_xlsx, write_parquet, iter_file
+from metrics import (
+    STAGES,
+    StageTimer,
+    count_cache_lookups,
+    iter_timed,
+    render_metrics,
+)
+from search import (
+    SEARCH_TABLE_DDL,
+    create_search_table,
+    index_candidates,
+    search_resumes,
+)
 import tempfile
-from flask import send_file, session
+import sqlite3
+import json
+import threading
+import time
+from collections import Counter
+from datetime import datetime, timedelta
+from dataclasses import dataclass
+from types import MappingProxyType
+from flask import session, Response, stream_with_context
 from flask_login import (
     LoginManager,
     UserMixin,
@@ -18,22 +49,119 @@ from flask_login import (
 from flask_bcrypt import Bcrypt
 from functools import wraps
 
-
-app = Flask(__name__)
-# app.config["UPLOAD_FOLDER"] = "uploads"
-app.config["UPLOAD_FOLDER"] = "/tmp/uploads"
-app.config["ALLOWED_EXTENSIONS"] = {"pdf"}
-app.secret_key = "SECRETT_KEY"
-app.config["SQLALCHEMY_DATABASE_URI"] = "sqlite:///screener_app.db"
-app.config["SQLALCHEMY_TRACK_MODIFICATIONS"] = False
-
-db = SQLAlchemy(app)
-migrate = Migrate(app, db)
-bcrypt = Bcrypt(app)
-
+db = SQLAlchemy()
+bcrypt = Bcrypt()
 login_manager = LoginManager()
-login_manager.login_view = "login"
-login_manager.init_app(app)
+login_manager.login_view = "screener.login"
+screener = Blueprint("screener", __name__)
+
+
+def create_app(config=None):
+    """
+    Builds the Flask app.
+
+    Args:
+        config (dict, optional): Settings overriding the environment-based
+            defaults, e.g. for tests.
+
+    Returns:
+        Flask: The configured app.
+    """
+    app = Flask(__name__)
+    app.secret_key = "SECRETT_KEY"
+    app.config["SQLALCHEMY_DATABASE_URI"] = "sqlite:///screener_app.db"
+    app.config["SQLALCHEMY_TRACK_MODIFICATIONS"] = False
+    app.config["MAX_CONCURRENT_EVALUATIONS"] = int(
+        os.getenv("MAX_CONCURRENT_EVALUATIONS", 8)
+    )
+    app.config["EVALUATION_CACHE_TTL_DAYS"] = int(
+        os.getenv("EVALUATION_CACHE_TTL_DAYS", 30)
+    )
+    app.config["EVALUATION_CACHE_MAX_ENTRIES"] = int(
+        os.getenv("EVALUATION_CACHE_MAX_ENTRIES", 10000)
+    )
+    app.config["JOB_CLAIM_BATCH_SIZE"] = int(os.getenv("JOB_CLAIM_BATCH_SIZE", 16))
+    app.config["JOB_LEASE_SECONDS"] = int(os.getenv("JOB_LEASE_SECONDS", 600))
+    app.config["JOB_MAX_ATTEMPTS"] = int(os.getenv("JOB_MAX_ATTEMPTS", 3))
+    # Delay before a requeued item is retried, doubled on each further attempt
+    app.config["JOB_RETRY_BACKOFF_SECONDS"] = float(
+        os.getenv("JOB_RETRY_BACKOFF_SECONDS", 30)
+    )
+    app.config["RESULTS_PER_PAGE"] = int(os.getenv("RESULTS_PER_PAGE", 50))
+    app.config["SSE_POLL_INTERVAL"] = float(os.getenv("SSE_POLL_INTERVAL", 1.0))
+    app.config["SSE_HEARTBEAT_SECONDS"] = float(os.getenv("SSE_HEARTBEAT_SECONDS", 15))
+    app.config["MAX_PDF_PAGES"] = int(os.getenv("MAX_PDF_PAGES", 20))
+    app.config["MAX_RESUME_CHARS"] = int(os.getenv("MAX_RESUME_CHARS", 50000))
+    app.config["RESUME_TOKEN_BUDGET"] = int(os.getenv("RESUME_TOKEN_BUDGET", 3000))
+    # Criteria of other positions screened in the same upload are added to a
+    # resume's evaluation call while they fit in this many tokens
+    app.config["CRITERIA_TOKEN_BUDGET"] = int(os.getenv("CRITERIA_TOKEN_BUDGET", 1500))
+    # Positions with a cascade cut-off send their borderline candidates to this
+    # model after OPENAI_MODEL has screened everyone; empty turns cascades off
+    app.config["CASCADE_MODEL"] = os.getenv("CASCADE_MODEL", "gpt-4o")
+    app.config["CASCADE_BAND"] = float(os.getenv("CASCADE_BAND", 0.1))
+    # Set BATCH_LOCAL_DIR to run batch-mode jobs against a local file-based stand-in
+    app.config["BATCH_LOCAL_DIR"] = os.getenv("BATCH_LOCAL_DIR")
+    app.config["BATCH_FILE_DIR"] = os.getenv(
+        "BATCH_FILE_DIR", os.path.join(tempfile.gettempdir(), "screener-batches")
+    )
+    app.config["BATCH_POLL_SECONDS"] = float(os.getenv("BATCH_POLL_SECONDS", 60))
+    app.config["EXPORT_CHUNK_SIZE"] = int(os.getenv("EXPORT_CHUNK_SIZE", 500))
+    app.config["SQLITE_BUSY_TIMEOUT_MS"] = int(
+        os.getenv("SQLITE_BUSY_TIMEOUT_MS", 30000)
+    )
+    app.config["MAX_ZIP_MEMBER_BYTES"] = int(
+        os.getenv("MAX_ZIP_MEMBER_BYTES", MAX_ZIP_MEMBER_BYTES)
+    )
+    app.config["EXTRACTION_WORKERS"] = int(
+        os.getenv("EXTRACTION_WORKERS", os.cpu_count() or 1)
+    )
+    if config:
+        app.config.update(config)
+
+    db.init_app(app)
+    bcrypt.init_app(app)
+    login_manager.init_app(app)
+    # Flask-Migrate pulls in Alembic, which only the "flask db" commands
+    # need, so it is only set up when the app is loaded by the flask CLI
+    if os.getenv("FLASK_RUN_FROM_CLI"):
+        from flask_migrate import Migrate
+
+        Migrate(app, db)
+    app.register_blueprint(screener)
+    app.cli.command("init-db")(init_db)
+
+    with app.app_context():
+        busy_timeout_ms = app.config["SQLITE_BUSY_TIMEOUT_MS"]
+        event.listen(
+            db.engine,
+            "connect",
+            lambda dbapi_connection, connection_record: set_sqlite_pragmas(
+                dbapi_connection, busy_timeout_ms
+            ),
+        )
+        ensure_schema()
+    return app
+
+
+def set_sqlite_pragmas(dbapi_connection, busy_timeout_ms):
+    """
+    Tunes every new SQLite connection for several web and worker processes
+    sharing one database file.
+    """
+    if not isinstance(dbapi_connection, sqlite3.Connection):
+        return
+    cursor = dbapi_connection.cursor()
+    # WAL lets readers proceed while a writer commits; writers wait for the
+    # lock for up to the busy timeout instead of failing with "database is
+    # locked"
+    cursor.execute("PRAGMA journal_mode=WAL")
+    cursor.execute(f"PRAGMA busy_timeout={busy_timeout_ms}")
+    # Safe with WAL: a power loss can only drop the last commits, not corrupt
+    cursor.execute("PRAGMA synchronous=NORMAL")
+    cursor.execute("PRAGMA temp_store=MEMORY")
+    cursor.execute("PRAGMA cache_size=-16000")
+    cursor.close()
 
 
 class User(db.Model, UserMixin):
@@ -56,7 +184,7 @@ def role_required(required_role):
         def wrapped_function(*args, **kwargs):
             if "role" not in session or session["role"] != required_role:
                 flash("Access denied. Insufficient permissions!", "danger")
-                return redirect(url_for("upload_files"))
+                return redirect(url_for("screener.upload_files"))
             return f(*args, **kwargs)
 
         return wrapped_function
@@ -76,6 +204,12 @@ class Position(db.Model):
     criteria = db.relationship(
         "Criteria", back_populates="position", cascade="all, delete-orphan"
     )
+    screening_config = db.relationship(
+        "ScreeningConfig",
+        back_populates="position",
+        cascade="all, delete-orphan",
+        uselist=False,
+    )
 
 
 class Criteria(db.Model):
@@ -85,37 +219,1222 @@ class Criteria(db.Model):
     criteria_type = db.Column(db.Integer, nullable=False)
     score = db.Column(db.Integer, nullable=False)
     position = db.relationship("Position", back_populates="criteria")
+    __table_args__ = (
+        db.Index("ix_criteria_position_type", "position_id", "criteria_type"),
+    )
 
 
-def clear_uploads_folder():
-    folder = app.config["UPLOAD_FOLDER"]
-    if os.path.exists(folder):
-        shutil.rmtree(folder)  # Remove all files and subdirectories
-    os.makedirs(folder, exist_ok=True)  # Recreate an empty folder
+class ScreeningConfig(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    position_id = db.Column(
+        db.Integer, db.ForeignKey("position.id"), nullable=False, unique=True
+    )
+    # Lexical pre-screening; resumes outside the shortlist skip the LLM call
+    prefilter_top_k = db.Column(db.Integer)
+    prefilter_min_score = db.Column(db.Float)
+    # Share of the qualification total added for veterans; VETERAN_BONUS if unset
+    veteran_bonus = db.Column(db.Float)
+    # Model cascade; scores within the band around the cut-off (both shares of
+    # the highest possible score) are re-evaluated by CASCADE_MODEL
+    cascade_cutoff = db.Column(db.Float)
+    cascade_band = db.Column(db.Float)
+    # Bumped whenever the position, its criteria or this config are saved,
+    # so every process can tell its cached PositionSpec is stale
+    version = db.Column(db.Integer, nullable=False, default=1)
+    position = db.relationship("Position", back_populates="screening_config")
+
+    @property
+    def prefilter_enabled(self):
+        return self.prefilter_top_k is not None or self.prefilter_min_score is not None
+
+
+class EvaluationCache(db.Model):
+    key = db.Column(db.String(64), primary_key=True)
+    result = db.Column(db.Text, nullable=False)
+    created_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+    last_used_at = db.Column(
+        db.DateTime, nullable=False, default=datetime.utcnow, index=True
+    )
+    hits = db.Column(db.Integer, nullable=False, default=0)
 
 
-clear_uploads_folder()
+def get_cached_evaluations(keys):
+    """
+    Looks up cached evaluation results and records hits and misses. The
+    hit counts are left for the caller's transaction to commit.
 
-with app.app_context():
-    db.create_all()
+    Args:
+        keys (list): Cache keys from evaluation_cache_key, one per resume.
+
+    Returns:
+        dict: Mapping of cache key to the cached result dict for every hit.
+    """
+    if not keys:
+        return {}
+
+    ttl = timedelta(days=current_app.config["EVALUATION_CACHE_TTL_DAYS"])
+    now = datetime.utcnow()
+    entries = EvaluationCache.query.filter(
+        EvaluationCache.key.in_(set(keys)),
+        EvaluationCache.created_at >= now - ttl,
+    ).all()
+
+    key_counts = Counter(keys)
+    cached = {}
+    for entry in entries:
+        entry.hits += key_counts[entry.key]
+        entry.last_used_at = now
+        cached[entry.key] = json.loads(entry.result)
+
+    hits = sum(key_counts[key] for key in cached)
+    count_cache_lookups(hits, len(keys) - hits)
+    return cached
+
+
+def store_evaluations(results):
+    """
+    Saves fresh evaluation results to the cache, skipping failed evaluations.
+    The cache is trimmed separately, see evict_evaluation_cache.
+
+    Args:
+        results (dict): Mapping of cache key to result dict from check_requirements.
+    """
+    for key, result in results.items():
+        if "error" in result:
+            continue
+        db.session.merge(EvaluationCache(key=key, result=json.dumps(result)))
+    db.session.commit()
+
+
+def evict_evaluation_cache():
+    """
+    Removes expired cache entries and stored verdicts, and trims both to
+    their maximum size, dropping the least recently used resumes first.
+    Run once per worker pass, as it counts the whole tables.
+    """
+    ttl = timedelta(days=current_app.config["EVALUATION_CACHE_TTL_DAYS"])
+    expired = datetime.utcnow() - ttl
+    EvaluationCache.query.filter(EvaluationCache.created_at < expired).delete(
+        synchronize_session=False
+    )
+    # A profile is rewritten whenever any of its verdicts is, so an expired
+    # profile's verdicts have expired too
+    ResumeProfile.query.filter(ResumeProfile.created_at < expired).delete(
+        synchronize_session=False
+    )
+    CriterionVerdict.query.filter(CriterionVerdict.created_at < expired).delete(
+        synchronize_session=False
+    )
+
+    overflow = (
+        EvaluationCache.query.count()
+        - current_app.config["EVALUATION_CACHE_MAX_ENTRIES"]
+    )
+    if overflow > 0:
+        stale_keys = (
+            db.session.query(EvaluationCache.key)
+            .order_by(EvaluationCache.last_used_at)
+            .limit(overflow)
+            .subquery()
+        )
+        EvaluationCache.query.filter(EvaluationCache.key.in_(stale_keys)).delete(
+            synchronize_session=False
+        )
+
+    overflow = (
+        ResumeProfile.query.count() - current_app.config["EVALUATION_CACHE_MAX_ENTRIES"]
+    )
+    if overflow > 0:
+        stale_keys = [
+            key
+            for (key,) in db.session.query(ResumeProfile.resume_key)
+            .order_by(ResumeProfile.last_used_at)
+            .limit(overflow)
+        ]
+        CriterionVerdict.query.filter(
+            CriterionVerdict.resume_key.in_(stale_keys)
+        ).delete(synchronize_session=False)
+        ResumeProfile.query.filter(ResumeProfile.resume_key.in_(stale_keys)).delete(
+            synchronize_session=False
+        )
+    db.session.commit()
+
+
+class ResumeProfile(db.Model):
+    # Criterion-independent part of a resume's evaluation, filed under
+    # functions.verdict_resume_key
+    resume_key = db.Column(db.String(64), primary_key=True)
+    name = db.Column(db.String(255))
+    email = db.Column(db.String(255))
+    summarization = db.Column(db.Text)
+    is_veteran = db.Column(db.Boolean, nullable=False)
+    created_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+    last_used_at = db.Column(
+        db.DateTime, nullable=False, default=datetime.utcnow, index=True
+    )
+
+
+class CriterionVerdict(db.Model):
+    # Whether a resume meets one criterion, by functions.criterion_hash, so a
+    # re-screen only asks the model about criteria that changed
+    resume_key = db.Column(db.String(64), primary_key=True)
+    criterion_hash = db.Column(db.String(64), primary_key=True)
+    met = db.Column(db.Boolean, nullable=False)
+    explanation = db.Column(db.Text)
+    created_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+
+
+def get_stored_verdicts(resume_keys):
+    """
+    Loads the stored profiles and per-criterion verdicts of several resumes,
+    leaving out expired ones like get_cached_evaluations does.
+
+    Args:
+        resume_keys (list): Keys from verdict_resume_key.
+
+    Returns:
+        dict: Mapping of resume key to (profile dict, {criterion_hash:
+            verdict dict}) for every resume with a stored profile.
+    """
+    if not resume_keys:
+        return {}
+
+    ttl = timedelta(days=current_app.config["EVALUATION_CACHE_TTL_DAYS"])
+    now = datetime.utcnow()
+    profiles = ResumeProfile.query.filter(
+        ResumeProfile.resume_key.in_(set(resume_keys)),
+        ResumeProfile.created_at >= now - ttl,
+    ).all()
+    for profile in profiles:
+        profile.last_used_at = now
+    stored = {
+        profile.resume_key: (
+            {
+                "name": profile.name,
+                "email": profile.email,
+                "summarization": profile.summarization,
+                "is_veteran": profile.is_veteran,
+            },
+            {},
+        )
+        for profile in profiles
+    }
+    if stored:
+        verdicts = CriterionVerdict.query.filter(
+            CriterionVerdict.resume_key.in_(list(stored)),
+            CriterionVerdict.created_at >= now - ttl,
+        )
+        for verdict in verdicts:
+            stored[verdict.resume_key][1][verdict.criterion_hash] = {
+                "met": verdict.met,
+                "explanation": verdict.explanation,
+            }
+    return stored
+
+
+def store_verdicts(resume_key, profile, verdicts):
+    """
+    Saves a resume's profile and per-criterion verdicts, replacing older ones.
+
+    Args:
+        resume_key (str): Key from verdict_resume_key.
+        profile (dict): Output of evaluation_profile.
+        verdicts (dict): Output of align_verdicts.
+    """
+    now = datetime.utcnow()
+    db.session.merge(
+        ResumeProfile(
+            resume_key=resume_key, created_at=now, last_used_at=now, **profile
+        )
+    )
+    for criterion, verdict in verdicts.items():
+        db.session.merge(
+            CriterionVerdict(
+                resume_key=resume_key,
+                criterion_hash=criterion,
+                created_at=now,
+                **verdict,
+            )
+        )
+    db.session.commit()
+
+
+class ScreeningJob(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    position_id = db.Column(db.Integer, db.ForeignKey("position.id"), nullable=False)
+    position_name = db.Column(db.String(80), nullable=False)
+    # "sync" jobs are evaluated call by call, "batch" jobs through the Batch API
+    mode = db.Column(db.String(10), nullable=False, default="sync")
+    # [prefilter ->] queued [-> batch_preparing -> batch_submitted]
+    #     -> running -> done / failed
+    status = db.Column(db.String(20), nullable=False, default="queued", index=True)
+    batch_id = db.Column(db.String(64))
+    lease_expires_at = db.Column(db.DateTime)
+    created_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+    finished_at = db.Column(db.DateTime)
+    prefilter_skipped = db.Column(db.Integer, nullable=False, default=0)
+    api_calls = db.Column(db.Integer, nullable=False, default=0)
+    prompt_tokens = db.Column(db.Integer, nullable=False, default=0)
+    completion_tokens = db.Column(db.Integer, nullable=False, default=0)
+    # Prompt tokens served from the provider's prefix cache
+    cached_tokens = db.Column(db.Integer, nullable=False, default=0)
+    # Criterion verdicts taken from earlier screenings instead of the model
+    reused_verdicts = db.Column(db.Integer, nullable=False, default=0)
+    # The job this one re-screens with the position's current criteria
+    source_job_id = db.Column(db.Integer, db.ForeignKey("screening_job.id"))
+    # Set when one upload is screened against several positions: the job of
+    # the first position leads, and the others follow its items
+    lead_job_id = db.Column(db.Integer, db.ForeignKey("screening_job.id"))
+    # Summed latency of the API calls; above evaluate_seconds when calls overlap
+    api_seconds = db.Column(db.Float, nullable=False, default=0)
+    # Models of the two cascade stages; the escalated_* counts are the part of
+    # the API totals above spent on the second, stronger one
+    model = db.Column(db.String(64), nullable=False, default=MODEL_NAME)
+    escalation_model = db.Column(db.String(64))
+    escalated_calls = db.Column(db.Integer, nullable=False, default=0)
+    escalated_prompt_tokens = db.Column(db.Integer, nullable=False, default=0)
+    escalated_completion_tokens = db.Column(db.Integer, nullable=False, default=0)
+    escalated_cached_tokens = db.Column(db.Integer, nullable=False, default=0)
+    escalated_seconds = db.Column(db.Float, nullable=False, default=0)
+    # Time spent in each pipeline stage, see metrics.STAGES
+    upload_seconds = db.Column(db.Float, nullable=False, default=0)
+    extract_seconds = db.Column(db.Float, nullable=False, default=0)
+    preprocess_seconds = db.Column(db.Float, nullable=False, default=0)
+    evaluate_seconds = db.Column(db.Float, nullable=False, default=0)
+    score_seconds = db.Column(db.Float, nullable=False, default=0)
+    export_seconds = db.Column(db.Float, nullable=False, default=0)
+    position = db.relationship("Position")
+    items = db.relationship(
+        "ScreeningJobItem",
+        back_populates="job",
+        cascade="all, delete-orphan",
+        order_by="ScreeningJobItem.seq",
+    )
+
+    run = db.relationship("ScreeningRun", back_populates="job", uselist=False)
+    source_job = db.relationship(
+        "ScreeningJob", remote_side=[id], foreign_keys=[source_job_id]
+    )
+    lead_job = db.relationship(
+        "ScreeningJob",
+        remote_side=[id],
+        foreign_keys=[lead_job_id],
+        back_populates="followers",
+    )
+    followers = db.relationship(
+        "ScreeningJob",
+        foreign_keys=[lead_job_id],
+        back_populates="lead_job",
+        order_by="ScreeningJob.id",
+    )
+
+    @property
+    def is_active(self):
+        return self.status not in ("done", "failed")
+
+    @property
+    def position_jobs(self):
+        """All jobs of a multi-position screening, the lead first."""
+        lead = self.lead_job or self
+        return [lead, *lead.followers]
+
+    @property
+    def stage_seconds(self):
+        return {stage: getattr(self, f"{stage}_seconds") or 0 for stage in STAGES}
+
+    @property
+    def model_stages(self):
+        """
+        API usage per model of the cascade, the cheap first stage first.
+        Only stages that made calls are listed; "cost" is None for models
+        without known prices.
+        """
+        escalated = {
+            "calls": self.escalated_calls,
+            "prompt_tokens": self.escalated_prompt_tokens,
+            "completion_tokens": self.escalated_completion_tokens,
+            "cached_tokens": self.escalated_cached_tokens,
+            "seconds": self.escalated_seconds,
+        }
+        first = {
+            "calls": self.api_calls - escalated["calls"],
+            "prompt_tokens": self.prompt_tokens - escalated["prompt_tokens"],
+            "completion_tokens": self.completion_tokens
+            - escalated["completion_tokens"],
+            "cached_tokens": self.cached_tokens - escalated["cached_tokens"],
+            "seconds": self.api_seconds - escalated["seconds"],
+        }
+        stages = []
+        for name, model, usage in (
+            ("first", self.model, first),
+            ("escalated", self.escalation_model, escalated),
+        ):
+            if usage["calls"]:
+                cost = estimate_cost(
+                    model,
+                    usage["prompt_tokens"],
+                    usage["completion_tokens"],
+                    usage["cached_tokens"],
+                )
+                stages.append({"stage": name, "model": model, **usage, "cost": cost})
+        return stages
+
+
+def record_stage_time(job_id, stage, seconds):
+    """
+    Adds time spent in a pipeline stage to the job's breakdown.
+
+    Args:
+        job_id (int): ID of the job the work was done for.
+        stage (str): One of metrics.STAGES.
+        seconds (float): Time spent.
+    """
+    column = getattr(ScreeningJob, f"{stage}_seconds")
+    # Incremented in SQL so concurrent workers on the same job don't clobber
+    ScreeningJob.query.filter_by(id=job_id).update(
+        {column: column + seconds}, synchronize_session=False
+    )
+
+
+class ScreeningJobItem(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    job_id = db.Column(db.Integer, db.ForeignKey("screening_job.id"), nullable=False)
+    seq = db.Column(db.Integer, nullable=False)
+    file_name = db.Column(db.String(255), nullable=False)
+    # Deferred so listing items doesn't load every uploaded PDF. Items of a
+    # follower job store no PDF; their text is copied from the lead's items.
+    pdf_data = db.deferred(db.Column(db.LargeBinary, nullable=False))
+    # pending -> running -> done / failed, or pending -> filtered; items of
+    # batch jobs go running -> batched while their batch is out, unclaimed
+    status = db.Column(db.String(20), nullable=False, default="pending")
+    claimed_by = db.Column(db.String(64))
+    lease_expires_at = db.Column(db.DateTime)
+    attempts = db.Column(db.Integer, nullable=False, default=0)
+    # Requeued items aren't claimed again before this time
+    not_before = db.Column(db.DateTime)
+    resume_text = db.Column(db.Text)
+    prefilter_score = db.Column(db.Float)
+    tokens_before = db.Column(db.Integer)
+    tokens_after = db.Column(db.Integer)
+    # Evaluation cache key, kept while the item waits on a batch
+    cache_key = db.Column(db.String(64))
+    result = db.Column(db.Text)
+    error = db.Column(db.Text)
+    # Duplicate detection, see dedupe.py
+    content_hash = db.Column(db.String(64))
+    email = db.Column(db.String(255))
+    minhash = db.Column(db.LargeBinary)
+    duplicate_of_id = db.Column(db.Integer, db.ForeignKey("screening_job_item.id"))
+    duplicate_reason = db.Column(db.String(100))
+    job = db.relationship("ScreeningJob", back_populates="items")
+    duplicate_of = db.relationship("ScreeningJobItem", remote_side=[id])
+
+    __table_args__ = (
+        db.Index("ix_screening_job_item_status", "status", "job_id"),
+        db.Index("ix_screening_job_item_job_seq", "job_id", "seq"),
+    )
+
+
+class ScreeningRun(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    job_id = db.Column(
+        db.Integer, db.ForeignKey("screening_job.id"), nullable=False, unique=True
+    )
+    position_id = db.Column(db.Integer, db.ForeignKey("position.id"), nullable=False)
+    position_name = db.Column(db.String(80), nullable=False)
+    created_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+    # Tier weights the candidates were scored with
+    min_qualification_score = db.Column(db.Integer, nullable=False)
+    pref_qualification_score = db.Column(db.Integer, nullable=False)
+    added_value_score = db.Column(db.Integer, nullable=False)
+    veteran_bonus = db.Column(db.Float, nullable=False, default=VETERAN_BONUS)
+    job = db.relationship("ScreeningJob", back_populates="run")
+    candidates = db.relationship(
+        "CandidateResult",
+        back_populates="run",
+        cascade="all, delete-orphan",
+        lazy="dynamic",
+    )
+
+    @property
+    def qualification_score(self):
+        return {
+            "Minimum Qualification": self.min_qualification_score,
+            "Preferred Qualification": self.pref_qualification_score,
+            "Added Value": self.added_value_score,
+        }
+
+
+class CandidateResult(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    run_id = db.Column(db.Integer, db.ForeignKey("screening_run.id"), nullable=False)
+    job_item_id = db.Column(db.Integer, db.ForeignKey("screening_job_item.id"))
+    file_name = db.Column(db.String(255), nullable=False)
+    candidate_name = db.Column(db.String(255))
+    email = db.Column(db.String(255))
+    is_veteran = db.Column(db.Boolean, nullable=False, default=False)
+    # Tier totals are NULL when the evaluation had no verdict for that tier
+    min_qualification_total = db.Column(db.Float)
+    pref_qualification_total = db.Column(db.Float)
+    added_value_total = db.Column(db.Float)
+    veteran_score = db.Column(db.Float, nullable=False, default=0)
+    final_score = db.Column(db.Float, nullable=False, default=0)
+    summary = db.Column(db.Text)
+    # File name of the resume whose evaluation this duplicate reused
+    duplicate_of = db.Column(db.String(255))
+    duplicate_reason = db.Column(db.String(100))
+    run = db.relationship("ScreeningRun", back_populates="candidates")
+    verdicts = db.relationship(
+        "QualificationVerdict",
+        back_populates="candidate",
+        cascade="all, delete-orphan",
+        order_by="QualificationVerdict.id",
+    )
+
+    __table_args__ = (
+        db.Index("ix_candidate_result_run_score", "run_id", "final_score"),
+    )
+
+    def to_dict(self):
+        return {
+            "id": self.id,
+            "item_id": self.job_item_id,
+            "file_name": self.file_name,
+            "candidate_name": self.candidate_name,
+            "email": self.email,
+            "is_veteran": self.is_veteran,
+            "min_qualification_total": self.min_qualification_total,
+            "pref_qualification_total": self.pref_qualification_total,
+            "added_value_total": self.added_value_total,
+            "veteran_score": self.veteran_score,
+            "final_score": self.final_score,
+            "summary": self.summary,
+            "duplicate_of": self.duplicate_of,
+            "duplicate_reason": self.duplicate_reason,
+        }
+
+
+class QualificationVerdict(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    candidate_result_id = db.Column(
+        db.Integer, db.ForeignKey("candidate_result.id"), nullable=False
+    )
+    qualification_type = db.Column(db.String(50), nullable=False)
+    qualification = db.Column(db.Text, nullable=False)
+    met = db.Column(db.Boolean, nullable=False)
+    score = db.Column(db.Integer, nullable=False)
+    explanation = db.Column(db.Text)
+    candidate = db.relationship("CandidateResult", back_populates="verdicts")
+
+    # Covers score_run's count of criteria met per candidate and tier
+    __table_args__ = (
+        db.Index(
+            "ix_qualification_verdict_candidate_type",
+            "candidate_result_id",
+            "qualification_type",
+            "met",
+        ),
+    )
+
+
+def nan_to_none(value):
+    return None if math.isnan(value) else float(value)
+
+
+def save_candidate_results(run, items):
+    """
+    Scores finished job items and adds their results and verdicts to the run.
+
+    The caller commits, so results arriving together are written in one go.
+
+    Args:
+        run (ScreeningRun): The run the items belong to.
+        items (list): ScreeningJobItem rows with status "done".
+    """
+    if not items:
+        return
+    with StageTimer("score", items=len(items)) as timer:
+        results_list = [json.loads(item.result) for item in items]
+        qualification_score = run.qualification_score
+        # Results often arrive one at a time, so score the verdicts directly
+        # rather than building score_batch's frame for each of them
+        tier_index = {tier: i for i, tier in enumerate(QUALIFICATION_TYPES)}
+        verdicts = [
+            (candidate_id, qualification)
+            for candidate_id, results in enumerate(results_list)
+            for qualification in results["qualifications"]
+        ]
+        totals, veteran_scores, final_scores = score_verdicts(
+            [candidate_id for candidate_id, _ in verdicts],
+            [
+                tier_index.get(qualification["qualification_type"], -1)
+                for _, qualification in verdicts
+            ],
+            [bool(qualification["true_or_false"]) for _, qualification in verdicts],
+            [bool(results["is_veteran"]) for results in results_list],
+            qualification_score,
+            run.veteran_bonus,
+        )
+
+        candidates = []
+        for item, results, row, veteran_score, final_score in zip(
+            items, results_list, totals, veteran_scores, final_scores
+        ):
+            candidates.append(
+                CandidateResult(
+                    run=run,
+                    job_item_id=item.id,
+                    file_name=item.file_name,
+                    duplicate_of=(
+                        item.duplicate_of.file_name if item.duplicate_of else None
+                    ),
+                    duplicate_reason=item.duplicate_reason,
+                    candidate_name=results["name"],
+                    email=results["email"],
+                    is_veteran=bool(results["is_veteran"]),
+                    min_qualification_total=nan_to_none(row[0]),
+                    pref_qualification_total=nan_to_none(row[1]),
+                    added_value_total=nan_to_none(row[2]),
+                    veteran_score=float(veteran_score),
+                    final_score=float(final_score),
+                    summary=results["summarization"],
+                    verdicts=[
+                        QualificationVerdict(
+                            qualification_type=qualification["qualification_type"],
+                            qualification=qualification["qualification"],
+                            met=bool(qualification["true_or_false"]),
+                            score=(
+                                qualification_score[qualification["qualification_type"]]
+                                if qualification["true_or_false"]
+                                else 0
+                            ),
+                            explanation=qualification.get("explanation"),
+                        )
+                        for qualification in results["qualifications"]
+                    ],
+                )
+            )
+        db.session.add_all(candidates)
+        # Flushed for the IDs the search index files the candidates under
+        db.session.flush()
+        index_candidates(
+            db.session,
+            [
+                {
+                    "id": candidate.id,
+                    "candidate_name": candidate.candidate_name,
+                    "summary": candidate.summary,
+                    "resume_text": preprocess_resume(item.resume_text or "")[
+                        "resume_text"
+                    ],
+                }
+                for item, candidate in zip(items, candidates)
+            ],
+        )
+    record_stage_time(run.job_id, "score", timer.seconds)
+
+
+def score_run(run_id, qualification_score, veteran_bonus):
+    """
+    Scores a finished run's candidates from their stored verdicts, without
+    saving anything, so weights can be tried out before they're applied.
+
+    Args:
+        run_id (int): ID of the run.
+        qualification_score (dict): Score per qualification tier.
+        veteran_bonus (float): Share of the total added for veterans.
+
+    Returns:
+        dict: Arrays with one entry per candidate, ordered by ID: "ids",
+            "previous" (the stored final scores), "totals", "veteran_scores"
+            and "final_scores".
+    """
+    import numpy as np
+
+    candidates = db.session.execute(
+        db.select(
+            CandidateResult.id, CandidateResult.is_veteran, CandidateResult.final_score
+        )
+        .filter_by(run_id=run_id)
+        .order_by(CandidateResult.id)
+    ).all()
+    # Only the number of criteria met per tier matters, so SQLite counts
+    # them and at most three rows per candidate are loaded
+    verdicts = db.session.execute(
+        db.select(
+            QualificationVerdict.candidate_result_id,
+            QualificationVerdict.qualification_type,
+            db.func.sum(db.cast(QualificationVerdict.met, db.Integer)),
+        )
+        .join(CandidateResult)
+        .where(CandidateResult.run_id == run_id)
+        .group_by(
+            QualificationVerdict.candidate_result_id,
+            QualificationVerdict.qualification_type,
+        )
+    ).all()
+
+    ids = np.array([row[0] for row in candidates], dtype=np.int64)
+    tier_index = {tier: i for i, tier in enumerate(QUALIFICATION_TYPES)}
+    totals, veteran_scores, final_scores = score_verdicts(
+        np.searchsorted(ids, [row[0] for row in verdicts]),
+        [tier_index.get(row[1], -1) for row in verdicts],
+        [row[2] for row in verdicts],
+        [row[1] for row in candidates],
+        qualification_score,
+        veteran_bonus,
+    )
+    return {
+        "ids": ids,
+        "previous": np.array([row[2] for row in candidates], dtype=float),
+        "totals": totals,
+        "veteran_scores": veteran_scores,
+        "final_scores": final_scores,
+    }
+
+
+def rank_candidates(ids, final_scores):
+    """
+    Ranks candidates the way the results page orders them: by final score,
+    then by ID.
+
+    Returns:
+        np.ndarray: The 1-based rank of each candidate.
+    """
+    import numpy as np
+
+    ranks = np.empty(len(ids), dtype=np.int64)
+    ranks[np.lexsort((ids, -final_scores))] = np.arange(1, len(ids) + 1)
+    return ranks
+
+
+def rescore_run(run, qualification_score, veteran_bonus):
+    """
+    Re-scores a finished run with new tier weights or veteran bonus, using
+    the stored verdicts instead of new evaluations.
+
+    The candidates and verdicts are updated with a handful of bulk
+    statements; the caller commits.
+
+    Args:
+        run (ScreeningRun): The run to re-score.
+        qualification_score (dict): Score per qualification tier.
+        veteran_bonus (float): Share of the total added for veterans.
+
+    Returns:
+        int: Number of candidates re-scored.
+    """
+    with StageTimer("score") as timer:
+        scored = score_run(run.id, qualification_score, veteran_bonus)
+        timer.items = len(scored["ids"])
+        rows = [
+            {
+                "id": candidate_id,
+                "min_qualification_total": nan_to_none(totals[0]),
+                "pref_qualification_total": nan_to_none(totals[1]),
+                "added_value_total": nan_to_none(totals[2]),
+                "veteran_score": veteran_score,
+                "final_score": final_score,
+            }
+            for candidate_id, totals, veteran_score, final_score in zip(
+                scored["ids"].tolist(),
+                scored["totals"].tolist(),
+                scored["veteran_scores"].tolist(),
+                scored["final_scores"].tolist(),
+            )
+        ]
+        if rows:
+            db.session.execute(db.update(CandidateResult), rows)
+
+        run_candidates = db.select(CandidateResult.id).filter_by(run_id=run.id)
+        for tier in QUALIFICATION_TYPES:
+            db.session.execute(
+                db.update(QualificationVerdict)
+                .where(
+                    QualificationVerdict.qualification_type == tier,
+                    QualificationVerdict.candidate_result_id.in_(run_candidates),
+                )
+                .values(
+                    score=db.case(
+                        (QualificationVerdict.met, qualification_score[tier]),
+                        else_=0,
+                    )
+                )
+                .execution_options(synchronize_session=False)
+            )
+
+        run.min_qualification_score = qualification_score["Minimum Qualification"]
+        run.pref_qualification_score = qualification_score["Preferred Qualification"]
+        run.added_value_score = qualification_score["Added Value"]
+        run.veteran_bonus = veteran_bonus
+    return len(rows)
+
+
+def read_score_weights(values, run):
+    """
+    Reads tier weights and a veteran bonus from form or query values, using
+    the run's current ones for any left out.
+
+    Args:
+        values (MultiDict): request.form or request.args.
+        run (ScreeningRun): The run the weights are for.
+
+    Returns:
+        tuple: (qualification_score dict, veteran_bonus), or None if a value
+            is negative.
+    """
+    qualification_score = {
+        tier: values.get(field, default=run.qualification_score[tier], type=int)
+        for tier, field in zip(
+            QUALIFICATION_TYPES,
+            (
+                "min-qualification-score",
+                "pref-qualification-score",
+                "added-value-qualification-score",
+            ),
+        )
+    }
+    veteran_bonus = values.get("veteran-bonus", default=run.veteran_bonus, type=float)
+    if veteran_bonus < 0 or min(qualification_score.values()) < 0:
+        return None
+    return qualification_score, veteran_bonus
+
+
+def get_export_columns(run):
+    """
+    Lists the columns of a run's detailed export.
+
+    Args:
+        run (ScreeningRun): The run to export.
+
+    Returns:
+        tuple: (columns, qualifications) where columns are (name, type) pairs
+            and qualifications are the per-qualification column names, in the
+            order they were first evaluated.
+    """
+    qualifications = [
+        qualification
+        for (qualification,) in db.session.query(QualificationVerdict.qualification)
+        .join(CandidateResult)
+        .filter(CandidateResult.run_id == run.id)
+        .group_by(QualificationVerdict.qualification)
+        .order_by(db.func.min(QualificationVerdict.id))
+    ]
+    columns = (
+        [("Candidate Name", "string"), ("Email", "string"), ("Veteran", "bool")]
+        + [(qualification, "float") for qualification in qualifications]
+        + [
+            ("Minimum Qualification Total Score", "float"),
+            ("Preferred Qualification Total Score", "float"),
+            ("Added Value Total Score", "float"),
+            ("Veteran Score", "float"),
+            ("Final Score", "float"),
+            ("Summary", "string"),
+            ("File Name", "string"),
+            ("Duplicate Of", "string"),
+        ]
+    )
+    return columns, qualifications
+
+
+def iter_export_rows(run, qualifications, chunk_size):
+    """
+    Reads a run's candidates from the database a chunk at a time, best final
+    score first, so exports never hold the whole run in memory.
+
+    Args:
+        run (ScreeningRun): The run to export.
+        qualifications (list): Qualification columns from get_export_columns.
+        chunk_size (int): Number of candidates per chunk.
+
+    Yields:
+        list: Row tuples matching get_export_columns.
+    """
+    candidates = db.session.execute(
+        db.select(CandidateResult)
+        .filter_by(run_id=run.id)
+        .order_by(CandidateResult.final_score.desc(), CandidateResult.id)
+        .execution_options(yield_per=chunk_size)
+    ).scalars()
+    for chunk in candidates.partitions():
+        scores = {}
+        for candidate_id, qualification, score in db.session.query(
+            QualificationVerdict.candidate_result_id,
+            QualificationVerdict.qualification,
+            QualificationVerdict.score,
+        ).filter(
+            QualificationVerdict.candidate_result_id.in_(
+                [candidate.id for candidate in chunk]
+            )
+        ):
+            scores.setdefault(candidate_id, {})[qualification] = score
+
+        rows = []
+        for candidate in chunk:
+            candidate_scores = scores.get(candidate.id, {})
+            rows.append(
+                (
+                    candidate.candidate_name,
+                    candidate.email,
+                    candidate.is_veteran,
+                    *[
+                        candidate_scores.get(qualification)
+                        for qualification in qualifications
+                    ],
+                    candidate.min_qualification_total,
+                    candidate.pref_qualification_total,
+                    candidate.added_value_total,
+                    candidate.veteran_score,
+                    candidate.final_score,
+                    candidate.summary,
+                    candidate.file_name,
+                    candidate.duplicate_of,
+                )
+            )
+        # Forget the exported chunk so the session doesn't grow with the run
+        for candidate in chunk:
+            db.session.expunge(candidate)
+        yield rows
+
+
+@dataclass(frozen=True)
+class PositionSpec:
+    """
+    Everything the screening pipeline needs from a position, compiled once:
+    the criteria split by tier, the tier weights, the pre-screening options
+    and the rendered prompt instructions.
+    """
+
+    position_id: int
+    name: str
+    min_qualifications: tuple
+    pref_qualifications: tuple
+    added_value: tuple
+    qualification_score: MappingProxyType
+    instructions: str
+    prefilter_top_k: int = None
+    prefilter_min_score: float = None
+    veteran_bonus: float = VETERAN_BONUS
+    cascade_cutoff: float = None
+    cascade_band: float = None
+    cascade_model: str = None
+    version: int = 0
+
+    @property
+    def criteria(self):
+        """(description, weight) pairs, as used by prefilter.rank_resumes."""
+        return tuple(
+            (description, self.qualification_score[qualification_type])
+            for qualification_type, descriptions in zip(
+                QUALIFICATION_TYPES,
+                (self.min_qualifications, self.pref_qualifications, self.added_value),
+            )
+            for description in descriptions
+        )
+
+    @property
+    def prefilter_enabled(self):
+        return self.prefilter_top_k is not None or self.prefilter_min_score is not None
+
+    @property
+    def cascade_enabled(self):
+        return (
+            self.cascade_cutoff is not None
+            and bool(self.cascade_model)
+            and self.cascade_model != MODEL_NAME
+        )
+
+    @property
+    def evaluation_model(self):
+        """
+        What evaluation cache keys are built with: the model, and with a
+        cascade its settings, so changing them doesn't reuse stale answers.
+        """
+        if not self.cascade_enabled:
+            return MODEL_NAME
+        return (
+            f"{MODEL_NAME}>{self.cascade_model}"
+            f"@{self.cascade_cutoff}+-{self.cascade_band}"
+        )
+
+
+position_specs = {}
+position_specs_lock = threading.Lock()
 
-os.makedirs(app.config["UPLOAD_FOLDER"], exist_ok=True)
 
+def compile_position_spec(position):
+    """
+    Builds the PositionSpec of a position from its criteria and config.
 
-def allowed_file(filename):
-    return (
-        "." in filename
-        and filename.rsplit(".", 1)[1].lower() in app.config["ALLOWED_EXTENSIONS"]
+    Args:
+        position (Position): The position to compile.
+
+    Returns:
+        PositionSpec: The compiled spec.
+    """
+    descriptions = {1: [], 2: [], 3: []}
+    scores = {}
+    for criteria in position.criteria:
+        descriptions[criteria.criteria_type].append(criteria.description)
+        scores.setdefault(criteria.criteria_type, criteria.score)
+
+    min_qualifications = tuple(descriptions[1])
+    pref_qualifications = tuple(descriptions[2])
+    added_value = tuple(descriptions[3])
+    config = position.screening_config
+    return PositionSpec(
+        position_id=position.id,
+        name=position.name,
+        min_qualifications=min_qualifications,
+        pref_qualifications=pref_qualifications,
+        added_value=added_value,
+        qualification_score=MappingProxyType(
+            {
+                qualification_type: scores.get(criteria_type, 0)
+                for criteria_type, qualification_type in enumerate(
+                    QUALIFICATION_TYPES, start=1
+                )
+            }
+        ),
+        instructions=build_instructions(
+            min_qualifications, pref_qualifications, added_value
+        ),
+        prefilter_top_k=config.prefilter_top_k if config else None,
+        prefilter_min_score=config.prefilter_min_score if config else None,
+        veteran_bonus=(
+            config.veteran_bonus
+            if config and config.veteran_bonus is not None
+            else VETERAN_BONUS
+        ),
+        cascade_cutoff=config.cascade_cutoff if config else None,
+        cascade_band=(
+            config.cascade_band
+            if config and config.cascade_band is not None
+            else current_app.config["CASCADE_BAND"]
+        ),
+        cascade_model=current_app.config["CASCADE_MODEL"],
+        version=config.version if config else 0,
     )
 
 
-def extract_text_from_pdf(file_path):
-    pdf = fitz.open(file_path)
-    final_text = [pdf[page_number].get_text() for page_number in range(len(pdf))]
-    return "\n".join(final_text)
+def get_position_spec(position_id):
+    """
+    Returns the compiled spec of a position, compiling it on first use.
+
+    Positions are edited in whichever web process handles the request, so
+    a cached spec is only returned while its version matches the
+    position's, which costs one small query.
+
+    Args:
+        position_id (int): ID of the position.
+
+    Returns:
+        PositionSpec: The spec, or None if the position doesn't exist.
+    """
+    row = (
+        db.session.query(ScreeningConfig.version)
+        .select_from(Position)
+        .outerjoin(ScreeningConfig)
+        .filter(Position.id == position_id)
+        .first()
+    )
+    if row is None:
+        invalidate_position_spec(position_id)
+        return None
+    # Positions saved before screening configs existed have none
+    version = row.version or 0
+    spec = position_specs.get(position_id)
+    if spec is None or spec.version != version:
+        position = Position.query.options(
+            db.selectinload(Position.criteria),
+            db.selectinload(Position.screening_config),
+        ).get(position_id)
+        if position is None:
+            return None
+        spec = compile_position_spec(position)
+        with position_specs_lock:
+            position_specs[position_id] = spec
+    return spec
+
+
+def invalidate_position_spec(position_id=None):
+    """
+    Drops a position's cached spec after its criteria change, or every
+    cached spec when no position is given.
+    """
+    with position_specs_lock:
+        if position_id is None:
+            position_specs.clear()
+        else:
+            position_specs.pop(position_id, None)
+
+
+def save_screening_config(position, form):
+    """
+    Updates a position's screening options from the position form.
+
+    Args:
+        position (Position): The position being created or edited.
+        form (ImmutableMultiDict): The submitted form data.
+    """
+    config = position.screening_config
+    if config is None:
+        config = ScreeningConfig(position=position)
+    else:
+        # Incremented in SQL so concurrent edits both count
+        config.version = ScreeningConfig.version + 1
+    config.prefilter_top_k = form.get("prefilter-top-k", type=int)
+    config.prefilter_min_score = form.get("prefilter-min-score", type=float)
+    config.veteran_bonus = form.get("veteran-bonus", type=float)
+    config.cascade_cutoff = form.get("cascade-cutoff", type=float)
+    config.cascade_band = form.get("cascade-band", type=float)
+    db.session.add(config)
+
+
+def get_job_counts(job_id):
+    """
+    Counts a job's items by status.
+
+    Returns:
+        dict: Number of items per status.
+    """
+    counts = {
+        "pending": 0,
+        "running": 0,
+        "batched": 0,
+        "done": 0,
+        "failed": 0,
+        "filtered": 0,
+    }
+    counts.update(
+        db.session.query(ScreeningJobItem.status, db.func.count())
+        .filter_by(job_id=job_id)
+        .group_by(ScreeningJobItem.status)
+        .all()
+    )
+    return counts
+
+
+def new_screening_job(spec, mode="sync"):
+    """
+    Creates a queued job, and its run, for screening resumes against a
+    position's current criteria and weights.
+
+    Args:
+        spec (PositionSpec): The position's compiled spec.
+        mode (str): "sync" or "batch".
+
+    Returns:
+        ScreeningJob: The new job, not yet added to the session.
+    """
+    job = ScreeningJob(position_id=spec.position_id, position_name=spec.name, mode=mode)
+    job.run = ScreeningRun(
+        position_id=spec.position_id,
+        position_name=spec.name,
+        min_qualification_score=spec.qualification_score["Minimum Qualification"],
+        pref_qualification_score=spec.qualification_score["Preferred Qualification"],
+        added_value_score=spec.qualification_score["Added Value"],
+        veteran_bonus=spec.veteran_bonus,
+    )
+    # Batch jobs are answered by the first model alone
+    if spec.cascade_enabled and mode == "sync":
+        job.escalation_model = spec.cascade_model
+    if spec.prefilter_enabled:
+        job.status = "prefilter"
+    return job
+
+
+def format_sse(event, data):
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+def schema_version():
+    """
+    Fingerprints the tables, columns and indexes of the models, so a change
+    to any of them gives a new version.
+
+    Returns:
+        int: A positive 31-bit number, as stored in SQLite's user_version.
+    """
+    parts = []
+    for table in db.metadata.sorted_tables:
+        parts.append(table.name)
+        parts.extend(f"{column.name}:{column.type}" for column in table.columns)
+        parts.extend(sorted(index.name for index in table.indexes))
+    parts.append(SEARCH_TABLE_DDL)
+    return zlib.crc32("\n".join(parts).encode("utf-8")) & 0x7FFFFFFF
+
+
+def init_db():
+    """Creates missing tables and indexes."""
+    db.create_all()
+    # create_all skips tables that already exist, so indexes added to older
+    # tables are created here
+    for table in db.metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(db.engine, checkfirst=True)
+    create_search_table(db.session)
+    index_missing_candidates()
+    db.session.execute(db.text(f"PRAGMA user_version={schema_version()}"))
+    db.session.commit()
 
 
-@app.route("/users", methods=["GET"])
+def index_missing_candidates(chunk_size=500):
+    """
+    Adds candidates saved before the search index existed to it.
+    """
+    while True:
+        rows = (
+            db.session.query(
+                CandidateResult.id,
+                CandidateResult.candidate_name,
+                CandidateResult.summary,
+                ScreeningJobItem.resume_text,
+            )
+            .outerjoin(
+                ScreeningJobItem, ScreeningJobItem.id == CandidateResult.job_item_id
+            )
+            .filter(
+                CandidateResult.id.notin_(
+                    db.select(db.literal_column("rowid")).select_from(
+                        db.table("resume_search")
+                    )
+                )
+            )
+            .order_by(CandidateResult.id)
+            .limit(chunk_size)
+            .all()
+        )
+        if not rows:
+            return
+        index_candidates(
+            db.session,
+            [
+                {
+                    "id": row.id,
+                    "candidate_name": row.candidate_name,
+                    "summary": row.summary,
+                    "resume_text": preprocess_resume(row.resume_text or "")[
+                        "resume_text"
+                    ],
+                }
+                for row in rows
+            ],
+        )
+
+
+def ensure_schema():
+    """
+    Runs init_db only when the models changed since it last ran, which is
+    once per deployment; otherwise a process start costs one PRAGMA read.
+    """
+    current = db.session.execute(db.text("PRAGMA user_version")).scalar()
+    db.session.commit()
+    if current != schema_version():
+        init_db()
+
+
+@screener.route("/users", methods=["GET"])
 @login_required
 @role_required("admin")
 def users():
@@ -124,17 +1443,17 @@ def users():
     return render_template("users.html", users=users)
 
 
-@app.route("/users/delete/<int:user_id>", methods=["POST"])
+@screener.route("/users/delete/<int:user_id>", methods=["POST"])
 @login_required
 @role_required("admin")
 def delete_user(user_id):
     user = User.query.get_or_404(user_id)
     db.session.delete(user)
     db.session.commit()
-    return redirect(url_for("users"))
+    return redirect(url_for("screener.users"))
 
 
-@app.route("/register", methods=["GET", "POST"])
+@screener.route("/register", methods=["GET", "POST"])
 @login_required
 @role_required("admin")
 def register():
@@ -155,12 +1474,12 @@ def register():
         db.session.commit()
 
         flash("Account created successfully!", "success")
-        return redirect(url_for("users"))
+        return redirect(url_for("screener.users"))
 
     return render_template("register.html")
 
 
-@app.route("/login", methods=["GET", "POST"])
+@screener.route("/login", methods=["GET", "POST"])
 def login():
     if request.method == "POST":
         email = request.form.get("email")
@@ -172,24 +1491,24 @@ def login():
             login_user(user)
             session["role"] = user.role
             session["user_id"] = user.id
-            return redirect(url_for("upload_files"))
+            return redirect(url_for("screener.upload_files"))
         else:
             flash("Login failed. Check email and password.", "danger")
-            return redirect(url_for("login"))
+            return redirect(url_for("screener.login"))
 
     return render_template("login.html")
 
 
-@app.route("/logout")
+@screener.route("/logout")
 @login_required
 def logout():
     session.pop("role", None)
     logout_user()
     flash("You have been logged out.", "info")
-    return redirect(url_for("login"))
+    return redirect(url_for("screener.login"))
 
 
-@app.route("/positions/add", methods=["GET", "POST"])
+@screener.route("/positions/add", methods=["GET", "POST"])
 @login_required
 @role_required("admin")
 def add_position():
@@ -207,40 +1526,35 @@ def add_position():
 
         if not position_name.strip():
             flash("Criteria name cannot be empty!", "danger")
-            return redirect(url_for("create_position"))  # Redirect back to the form
+            return redirect(
+                url_for("screener.create_position")
+            )  # Redirect back to the form
         else:
             new_position = Position(name=position_name)
             db.session.add(new_position)
-            db.session.commit()
-
-            for min_criteria in min_qualifications:
-                criteria = Criteria(
-                    description=min_criteria,
-                    position_id=new_position.id,
-                    criteria_type=1,
-                    score=int(min_qualification_score),
-                )
-                db.session.add(criteria)
-
-            for pref_criteria in pref_qualifications:
-                criteria = Criteria(
-                    description=pref_criteria,
-                    position_id=new_position.id,
-                    criteria_type=2,
-                    score=int(pref_qualification_score),
+            db.session.flush()
+
+            # One executemany for all criteria, committed with the position
+            criteria_rows = [
+                {
+                    "description": description,
+                    "position_id": new_position.id,
+                    "criteria_type": criteria_type,
+                    "score": int(score),
+                }
+                for criteria_type, descriptions, score in (
+                    (1, min_qualifications, min_qualification_score),
+                    (2, pref_qualifications, pref_qualification_score),
+                    (3, added_value, added_value_qualification_score),
                 )
-                db.session.add(criteria)
-
-            for added_criteria in added_value:
-                criteria = Criteria(
-                    description=added_criteria,
-                    position_id=new_position.id,
-                    criteria_type=3,
-                    score=int(added_value_qualification_score),
-                )
-                db.session.add(criteria)
+                for description in descriptions
+            ]
+            if criteria_rows:
+                db.session.execute(db.insert(Criteria), criteria_rows)
+            save_screening_config(new_position, request.form)
             db.session.commit()
-            return redirect(url_for("get_position"))
+            invalidate_position_spec(new_position.id)
+            return redirect(url_for("screener.get_position"))
 
     return render_template("create_position.html")
 
@@ -276,9 +1590,9 @@ def sync_criteria(
             db.session.delete(criteria)
 
 
+@screener.route("/positions/edit/<int:position_id>", methods=["GET", "POST"])
 @login_required
 @role_required("admin")
-@app.route("/positions/edit/<int:position_id>", methods=["GET", "POST"])
 def edit_position(position_id):
     # Fetch position and associated criteria
     position = Position.query.get_or_404(position_id)
@@ -294,6 +1608,8 @@ def edit_position(position_id):
     ).all()
 
     if request.method == "POST":
+        previous_spec = get_position_spec(position_id)
+
         # Update position name
         position.name = request.form["position-name"]
 
@@ -328,11 +1644,23 @@ def edit_position(position_id):
             added_value, added_value_descriptions, 3, position.id, added_value_score
         )
 
+        save_screening_config(position, request.form)
+
         # Commit changes to the database
         db.session.commit()
+        invalidate_position_spec(position.id)
+
+        # New weights only change the scores, so earlier screenings are
+        # re-ranked from their stored verdicts right away
+        spec = get_position_spec(position.id)
+        if (
+            spec.qualification_score != previous_spec.qualification_score
+            or spec.veteran_bonus != previous_spec.veteran_bonus
+        ):
+            rescore_position_runs(spec)
 
         # Redirect to the positions list (or any relevant page)
-        return redirect(url_for("get_position"))
+        return redirect(url_for("screener.get_position"))
 
     # Render the edit form
     return render_template(
@@ -341,20 +1669,47 @@ def edit_position(position_id):
         min_criteria=min_criteria,
         pref_criteria=pref_criteria,
         added_value=added_value,
+        config=position.screening_config,
     )
 
 
-@app.route("/positions/delete/<int:position_id>", methods=["POST"])
+def rescore_position_runs(spec):
+    """
+    Re-scores the finished runs of a position with its current weights and
+    veteran bonus, and commits.
+
+    Args:
+        spec (PositionSpec): The position's compiled spec.
+    """
+    runs = (
+        ScreeningRun.query.join(ScreeningJob)
+        .filter(
+            ScreeningRun.position_id == spec.position_id,
+            ScreeningJob.status.in_(("done", "failed")),
+        )
+        .all()
+    )
+    for run in runs:
+        if (
+            run.qualification_score != dict(spec.qualification_score)
+            or run.veteran_bonus != spec.veteran_bonus
+        ):
+            rescore_run(run, dict(spec.qualification_score), spec.veteran_bonus)
+    db.session.commit()
+
+
+@screener.route("/positions/delete/<int:position_id>", methods=["POST"])
 @login_required
 @role_required("admin")
 def delete_position(position_id):
     position = Position.query.get_or_404(position_id)
     db.session.delete(position)
     db.session.commit()
-    return redirect(url_for("get_position"))
+    invalidate_position_spec(position_id)
+    return redirect(url_for("screener.get_position"))
 
 
-@app.route("/positions", methods=["GET"])
+@screener.route("/positions", methods=["GET"])
 @login_required
 @role_required("admin")
 def get_position():
@@ -362,73 +1717,512 @@ def get_position():
     return render_template("positions.html", positions=positions)
 
 
-@app.route("/download", methods=["GET"])
+@screener.route("/download", methods=["GET"])
 @login_required
 def download_results():
-    # Get position_name from query parameters
-    position_name = request.args.get("position_name")
-    if not position_name:
-        flash("Position name is missing for download.", "danger")
-        return redirect(url_for("upload_files"))
+    run_id = request.args.get("run_id", type=int)
+    run = ScreeningRun.query.get(run_id) if run_id else None
+    if run is None:
+        flash(
+            "Requested results not found. Please try generating results again.",
+            "danger",
+        )
+        return redirect(url_for("screener.upload_files"))
 
-    temp_dir = tempfile.gettempdir()
-    output_path = os.path.join(temp_dir, f"{position_name} Screening Result.xlsx")
+    export_format = request.args.get("format", "xlsx")
+    if export_format not in EXPORT_FORMATS:
+        flash(f"Unsupported export format: {export_format}", "danger")
+        return redirect(url_for("screener.job_results", job_id=run.job_id))
 
-    # Check if the file exists before sending
-    if not os.path.exists(output_path):
-        flash(
-            "Requested file not found. Please try generating results again.", "danger"
+    columns, qualifications = get_export_columns(run)
+    chunks = iter_export_rows(
+        run, qualifications, chunk_size=current_app.config["EXPORT_CHUNK_SIZE"]
+    )
+    job_id = run.job_id
+
+    def record_export_time(seconds):
+        record_stage_time(job_id, "export", seconds)
+        db.session.commit()
+
+    headers = {
+        "Content-Disposition": (
+            f'attachment; filename="{run.position_name} Screening Result'
+            f'.{export_format}"'
+        )
+    }
+    if export_format == "csv":
+        csv_chunks = iter_timed(
+            "export", stream_csv(columns, chunks), on_finish=record_export_time
+        )
+        return Response(
+            stream_with_context(csv_chunks),
+            mimetype=EXPORT_FORMATS["csv"],
+            headers=headers,
         )
-        return redirect(url_for("upload_files"))
 
-    return send_file(
-        output_path,
-        as_attachment=True,
-        mimetype="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
-        download_name=f"{position_name} Screening Result.xlsx",
+    # XLSX and Parquet are binary containers that must be finished before
+    # they can be read, so they are spooled to a temporary file and streamed
+    fd, path = tempfile.mkstemp(suffix=f".{export_format}")
+    os.close(fd)
+    writer = write_xlsx if export_format == "xlsx" else write_parquet
+    try:
+        with StageTimer("export") as timer:
+            writer(path, columns, chunks)
+    except Exception:
+        os.remove(path)
+        raise
+    record_export_time(timer.seconds)
+    headers["Content-Length"] = str(os.path.getsize(path))
+    response = Response(
+        iter_file(path), mimetype=EXPORT_FORMATS[export_format], headers=headers
     )
+    # Runs whether or not the body is read, e.g. for HEAD requests
+    response.call_on_close(lambda: os.remove(path))
+    return response
+
+
+@screener.route("/metrics", methods=["GET"])
+def metrics():
+    # Left open for the Prometheus scraper; restrict it at the proxy if needed
+    body, content_type = render_metrics()
+    return Response(body, content_type=content_type)
 
 
-@app.route("/", methods=["GET", "POST"])
+@screener.route("/jobs/<int:job_id>/status", methods=["GET"])
 @login_required
-def upload_files():
-    if request.method == "POST":
-        position_id = request.form.get("position-id")
-        position_name = Position.query.get(position_id).name
-        criteria_list = Criteria.query.filter_by(position_id=position_id).all()
-        min_qualifications = [
-            criteria.description
-            for criteria in criteria_list
-            if criteria.criteria_type == 1
-        ]
-        pref_qualifications = [
-            criteria.description
-            for criteria in criteria_list
-            if criteria.criteria_type == 2
-        ]
-        added_value = [
-            criteria.description
-            for criteria in criteria_list
-            if criteria.criteria_type == 3
-        ]
+def job_status(job_id):
+    job = ScreeningJob.query.get_or_404(job_id)
+    counts = get_job_counts(job.id)
+    duplicates = ScreeningJobItem.query.filter(
+        ScreeningJobItem.job_id == job.id,
+        ScreeningJobItem.duplicate_of_id.isnot(None),
+    ).count()
+    return jsonify(
+        {
+            "job_id": job.id,
+            "position_name": job.position_name,
+            "status": job.status,
+            "mode": job.mode,
+            "total": sum(counts.values()),
+            "counts": counts,
+            "llm_calls_saved": job.prefilter_skipped + duplicates,
+            "duplicates": duplicates,
+            "source_job_id": job.source_job_id,
+            "lead_job_id": job.lead_job_id,
+            "reused_verdicts": job.reused_verdicts,
+            "usage": {
+                "api_calls": job.api_calls,
+                "prompt_tokens": job.prompt_tokens,
+                "completion_tokens": job.completion_tokens,
+                "cached_tokens": job.cached_tokens,
+                "api_seconds": job.api_seconds,
+                "stages": job.model_stages,
+            },
+            "stage_seconds": job.stage_seconds,
+            "items": [
+                {
+                    "file_name": item.file_name,
+                    "status": item.status,
+                    "attempts": item.attempts,
+                    "prefilter_score": item.prefilter_score,
+                    "tokens_before": item.tokens_before,
+                    "tokens_after": item.tokens_after,
+                    "error": item.error,
+                    "duplicate_of": (
+                        item.duplicate_of.file_name if item.duplicate_of else None
+                    ),
+                }
+                for item in job.items
+            ],
+        }
+    )
+
+
+@screener.route("/jobs/<int:job_id>/stream", methods=["GET"])
+@login_required
+def job_stream(job_id):
+    job = ScreeningJob.query.get_or_404(job_id)
+    run_id = job.run.id
+    total = ScreeningJobItem.query.filter_by(job_id=job_id).count()
+
+    def generate():
+        last_candidate_id = 0
+        seen_items = set()
+        scores = {}
+        last_sent = time.monotonic()
+        while True:
+            # End the read transaction so rows committed by workers become visible
+            db.session.rollback()
+            sent = False
+            new_candidates = (
+                CandidateResult.query.filter(
+                    CandidateResult.run_id == run_id,
+                    CandidateResult.id > last_candidate_id,
+                )
+                .order_by(CandidateResult.id)
+                .all()
+            )
+            for candidate in new_candidates:
+                last_candidate_id = candidate.id
+                scores[candidate.id] = candidate.final_score
+                yield format_sse("candidate", candidate.to_dict())
+                sent = True
+
+            skipped = ScreeningJobItem.query.filter(
+                ScreeningJobItem.job_id == job_id,
+                ScreeningJobItem.status.in_(["failed", "filtered"]),
+            ).all()
+            for item in skipped:
+                if item.id in seen_items:
+                    continue
+                seen_items.add(item.id)
+                yield format_sse(
+                    item.status,
+                    {
+                        "item_id": item.id,
+                        "file_name": item.file_name,
+                        "prefilter_score": item.prefilter_score,
+                        "error": item.error,
+                    },
+                )
+                sent = True
+
+            if sent:
+                yield format_sse(
+                    "ranking",
+                    {
+                        "order": sorted(scores, key=lambda id: -scores[id]),
+                        "finished": len(scores) + len(seen_items),
+                        "total": total,
+                    },
+                )
+                last_sent = time.monotonic()
+
+            status = db.session.query(ScreeningJob.status).filter_by(id=job_id).scalar()
+            if status in ("done", "failed"):
+                yield format_sse("done", {"status": status})
+                return
+
+            if (
+                time.monotonic() - last_sent
+                > current_app.config["SSE_HEARTBEAT_SECONDS"]
+            ):
+                yield ": keep-alive\n\n"
+                last_sent = time.monotonic()
+            time.sleep(current_app.config["SSE_POLL_INTERVAL"])
+
+    return Response(
+        stream_with_context(generate()),
+        mimetype="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
 
-        min_qualification_score = [
-            criteria.score for criteria in criteria_list if criteria.criteria_type == 1
-        ][0]
 
-        pref_qualification_score = [
-            criteria.score for criteria in criteria_list if criteria.criteria_type == 2
-        ][0]
+@screener.route("/jobs/<int:job_id>", methods=["GET"])
+@login_required
+def job_results(job_id):
+    job = ScreeningJob.query.get_or_404(job_id)
+    # While the job runs, rows are streamed in by job_stream instead
+    candidates = None
+    if not job.is_active:
+        candidates = job.run.candidates.order_by(
+            CandidateResult.final_score.desc(), CandidateResult.id
+        ).paginate(
+            page=request.args.get("page", 1, type=int),
+            per_page=current_app.config["RESULTS_PER_PAGE"],
+            error_out=False,
+        )
+    counts = get_job_counts(job.id)
+    tokens_before, tokens_after = (
+        db.session.query(
+            db.func.coalesce(db.func.sum(ScreeningJobItem.tokens_before), 0),
+            db.func.coalesce(db.func.sum(ScreeningJobItem.tokens_after), 0),
+        )
+        .filter_by(job_id=job.id)
+        .one()
+    )
+    return render_template(
+        "results.html",
+        job=job,
+        total=sum(counts.values()),
+        finished=counts["done"] + counts["failed"] + counts["filtered"],
+        tokens_before=tokens_before,
+        tokens_after=tokens_after,
+        candidates=candidates,
+        download_url=url_for("screener.download_results", run_id=job.run.id),
+        position_name=job.position_name,
+    )
 
-        added_value_score = [
-            criteria.score for criteria in criteria_list if criteria.criteria_type == 3
-        ][0]
 
-        qualification_score = {
-            "Minimum Qualification": min_qualification_score,
-            "Preferred Qualification": pref_qualification_score,
-            "Added Value": added_value_score,
+@screener.route("/jobs/<int:job_id>/rescreen", methods=["POST"])
+@login_required
+def rescreen_job(job_id):
+    job = ScreeningJob.query.get_or_404(job_id)
+    if job.is_active:
+        flash("Wait for the screening to finish before re-screening it.", "warning")
+        return redirect(url_for("screener.job_results", job_id=job.id))
+    spec = get_position_spec(job.position_id)
+    if spec is None:
+        flash("The position of this screening was deleted.", "danger")
+        return redirect(url_for("screener.job_results", job_id=job.id))
+
+    # The resumes are copied inside the database, extracted text included.
+    # Workers reuse the stored verdicts, so only criteria added or changed
+    # since the last screening are sent to the model.
+    new_job = new_screening_job(spec)
+    new_job.source_job_id = job.id
+    db.session.add(new_job)
+    db.session.flush()
+    db.session.execute(
+        db.insert(ScreeningJobItem).from_select(
+            ["job_id", "seq", "file_name", "pdf_data", "resume_text"],
+            db.select(
+                db.literal(new_job.id),
+                ScreeningJobItem.seq,
+                ScreeningJobItem.file_name,
+                ScreeningJobItem.pdf_data,
+                ScreeningJobItem.resume_text,
+            ).where(ScreeningJobItem.job_id == job.id),
+        )
+    )
+    db.session.commit()
+    return redirect(url_for("screener.job_results", job_id=new_job.id))
+
+
+@screener.route("/search", methods=["GET"])
+@login_required
+def search():
+    query = request.args.get("q", "").strip()
+    per_page = current_app.config["RESULTS_PER_PAGE"]
+    page = max(request.args.get("page", 1, type=int), 1)
+
+    start = time.perf_counter()
+    total, hits = search_resumes(
+        db.session, query, limit=per_page, offset=(page - 1) * per_page
+    )
+    candidates = {
+        candidate.id: candidate
+        for candidate in CandidateResult.query.options(
+            db.joinedload(CandidateResult.run)
+        ).filter(CandidateResult.id.in_([hit["id"] for hit in hits]))
+    }
+    results = [
+        {
+            **hit,
+            "file_name": candidates[hit["id"]].file_name,
+            "email": candidates[hit["id"]].email,
+            "final_score": candidates[hit["id"]].final_score,
+            "position_name": candidates[hit["id"]].run.position_name,
+            "screened_at": candidates[hit["id"]].run.created_at,
+            "job_id": candidates[hit["id"]].run.job_id,
         }
+        for hit in hits
+        # Index entries outlive candidates deleted with their run
+        if hit["id"] in candidates
+    ]
+    seconds = time.perf_counter() - start
+
+    pages = max(1, math.ceil(total / per_page))
+    if request.accept_mimetypes.best == "application/json":
+        return jsonify(
+            {
+                "query": query,
+                "total": total,
+                "page": page,
+                "pages": pages,
+                "seconds": seconds,
+                "results": [
+                    {**result, "screened_at": result["screened_at"].isoformat()}
+                    for result in results
+                ],
+            }
+        )
+    return render_template(
+        "search.html",
+        query=query,
+        total=total,
+        page=page,
+        pages=pages,
+        seconds=seconds,
+        results=results,
+    )
+
+
+@screener.route("/jobs/<int:job_id>/positions", methods=["GET"])
+@login_required
+def position_matrix(job_id):
+    import numpy as np
+
+    jobs = ScreeningJob.query.get_or_404(job_id).position_jobs
+    run_jobs = {each.run.id: each for each in jobs}
+    rows = (
+        db.session.query(
+            ScreeningJobItem.seq,
+            CandidateResult.run_id,
+            CandidateResult.id,
+            CandidateResult.file_name,
+            CandidateResult.candidate_name,
+            CandidateResult.final_score,
+        )
+        .join(CandidateResult, CandidateResult.job_item_id == ScreeningJobItem.id)
+        .filter(CandidateResult.run_id.in_(list(run_jobs)))
+        .all()
+    )
+
+    # One row per resume, with its score and rank for every position
+    candidates = {}
+    for run_id, each in run_jobs.items():
+        run_rows = [row for row in rows if row.run_id == run_id]
+        ranks = rank_candidates(
+            np.array([row.id for row in run_rows], dtype=np.int64),
+            np.array([row.final_score for row in run_rows], dtype=float),
+        )
+        for row, rank in zip(run_rows, ranks.tolist()):
+            candidate = candidates.setdefault(
+                row.seq,
+                {
+                    "file_name": row.file_name,
+                    "candidate_name": row.candidate_name,
+                    "scores": {},
+                },
+            )
+            candidate["scores"][each.id] = {
+                "final_score": row.final_score,
+                "rank": rank,
+            }
+    for candidate in candidates.values():
+        candidate["best_job_id"] = max(
+            candidate["scores"],
+            key=lambda job_id: candidate["scores"][job_id]["final_score"],
+        )
+    matrix = [
+        candidate
+        for _, candidate in sorted(
+            candidates.items(),
+            key=lambda item: (
+                -item[1]["scores"][item[1]["best_job_id"]]["final_score"],
+                item[0],
+            ),
+        )
+    ]
+
+    per_page = current_app.config["RESULTS_PER_PAGE"]
+    pages = max(1, math.ceil(len(matrix) / per_page))
+    page = min(max(request.args.get("page", 1, type=int), 1), pages)
+    matrix = matrix[(page - 1) * per_page : page * per_page]
+    positions = []
+    for each in jobs:
+        counts = get_job_counts(each.id)
+        positions.append(
+            {
+                "job_id": each.id,
+                "position_name": each.position_name,
+                "status": each.status,
+                "total": sum(counts.values()),
+                "finished": counts["done"] + counts["failed"] + counts["filtered"],
+                "candidates": sum(1 for row in rows if run_jobs[row.run_id] is each),
+            }
+        )
+
+    if request.accept_mimetypes.best == "application/json":
+        return jsonify(
+            {"positions": positions, "candidates": matrix, "page": page, "pages": pages}
+        )
+    return render_template(
+        "position_matrix.html",
+        positions=positions,
+        candidates=matrix,
+        page=page,
+        pages=pages,
+        is_active=any(each.is_active for each in jobs),
+        lead_job_id=jobs[0].id,
+    )
+
+
+@screener.route("/jobs/<int:job_id>/what-if", methods=["GET"])
+@login_required
+def preview_weights(job_id):
+    job = ScreeningJob.query.get_or_404(job_id)
+    weights = read_score_weights(request.args, job.run)
+    if weights is None:
+        return jsonify({"error": "Weights can't be negative."}), 400
+    qualification_score, veteran_bonus = weights
+
+    start = time.perf_counter()
+    scored = score_run(job.run.id, qualification_score, veteran_bonus)
+    ids, final_scores = scored["ids"], scored["final_scores"]
+    ranks = rank_candidates(ids, final_scores)
+    previous_ranks = rank_candidates(ids, scored["previous"])
+    top = ranks.argsort()[: request.args.get("limit", 10, type=int)]
+    seconds = time.perf_counter() - start
+
+    names = dict(
+        db.session.query(CandidateResult.id, CandidateResult.candidate_name).filter(
+            CandidateResult.id.in_(ids[top].tolist())
+        )
+    )
+    return jsonify(
+        {
+            "qualification_score": qualification_score,
+            "veteran_bonus": veteran_bonus,
+            "candidates": len(ids),
+            "moved": int((ranks != previous_ranks).sum()),
+            "seconds": seconds,
+            "ranking": [
+                {
+                    "id": int(ids[i]),
+                    "candidate_name": names.get(int(ids[i])),
+                    "rank": int(ranks[i]),
+                    "previous_rank": int(previous_ranks[i]),
+                    "final_score": float(final_scores[i]),
+                    "previous_score": float(scored["previous"][i]),
+                }
+                for i in top
+            ],
+        }
+    )
+
+
+@screener.route("/jobs/<int:job_id>/rescore", methods=["POST"])
+@login_required
+@role_required("admin")
+def rescore_job(job_id):
+    job = ScreeningJob.query.get_or_404(job_id)
+    if job.is_active:
+        flash(
+            "Wait for the screening to finish before changing its weights.", "warning"
+        )
+        return redirect(url_for("screener.job_results", job_id=job.id))
+    weights = read_score_weights(request.form, job.run)
+    if weights is None:
+        flash("Weights can't be negative.", "danger")
+        return redirect(url_for("screener.job_results", job_id=job.id))
+
+    start = time.perf_counter()
+    count = rescore_run(job.run, *weights)
+    db.session.commit()
+    flash(
+        f"Re-ranked {count} candidates with the new weights in "
+        f"{time.perf_counter() - start:.2f}s.",
+        "success",
+    )
+    return redirect(url_for("screener.job_results", job_id=job.id))
+
+
+@screener.route("/", methods=["GET", "POST"])
+@login_required
+def upload_files():
+    if request.method == "POST":
+        position_ids = request.form.getlist("position-id", type=int)
+        specs = [get_position_spec(position_id) for position_id in position_ids]
+        if not specs or None in specs:
+            flash("Select a position", "danger")
+            return redirect(request.url)
+        specs = list({spec.position_id: spec for spec in specs}.values())
+        batch_mode = bool(request.form.get("batch-mode"))
+        if batch_mode and len(specs) > 1:
+            flash("Batch mode screens one position at a time.", "danger")
+            return redirect(request.url)
 
         if "files[]" not in request.files:
             flash("No file part", "danger")
@@ -440,46 +2234,86 @@ def upload_files():
             flash("No files selected!", "danger")
             return redirect(request.url)
 
-        for file in files:
-            if not file.filename.endswith(".pdf"):
-                flash("Select only pdf files", "danger")
-                return redirect(request.url)
-
-        merged_score = []
-        for file in files:
-            if file and allowed_file(file.filename):
-                filename = secure_filename(file.filename)
-                filepath = os.path.join(app.config["UPLOAD_FOLDER"], filename)
-                file.save(filepath)
-
-                # Extract text and calculate match score
-                resume_text = extract_text_from_pdf(filepath)
-                resume_data = preprocess_resume(resume_text)
-                results = check_requirements(
-                    resume_data=resume_data,
-                    min_qualifications=min_qualifications,
-                    pref_qualifications=pref_qualifications,
-                    added_value=added_value,
-                )
-                score = get_score(results, qualification_score=qualification_score)
-                score["File Name"] = [filename]
-                merged_score.append(score)
-        final_result = pd.concat(merged_score)
-
-        # Save Excel file to a temporary location
-        temp_dir = tempfile.gettempdir()
-        output_path = os.path.join(temp_dir, f"{position_name} Screening Result.xlsx")
-        final_result.to_excel(output_path)
-
-        return render_template(
-            "results.html",
-            final_result=final_result,
-            download_url=url_for("download_results", position_name=position_name),
-            position_name=position_name,
+        # Queue the batch; a worker process (worker.py) does the screening.
+        # With several positions each gets a job; the worker extracts every
+        # resume once, for the first one, and evaluates it for all of them.
+        job = new_screening_job(specs[0], mode="batch" if batch_mode else "sync")
+        followers = [new_screening_job(spec) for spec in specs[1:]]
+        for follower in followers:
+            follower.lead_job = job
+        if followers:
+            # Pre-screening shortlists resumes for one position, but a resume
+            # it drops may be the best fit for another
+            for each in (job, *followers):
+                each.status = "queued"
+        db.session.add_all([job, *followers])
+        db.session.flush()
+
+        # PDFs are written as they are read, one archive member at a time,
+        # and dropped from the session so large uploads don't pile up in memory
+        seq = 0
+        skipped = []
+        pdfs = iter_uploaded_pdfs(
+            files, max_member_bytes=current_app.config["MAX_ZIP_MEMBER_BYTES"]
         )
+        with StageTimer("upload") as timer:
+            for file_name, pdf_data, reason in pdfs:
+                if reason is not None:
+                    skipped.append({"file_name": file_name, "reason": reason})
+                    continue
+                item = ScreeningJobItem(
+                    job_id=job.id, seq=seq, file_name=file_name, pdf_data=pdf_data
+                )
+                db.session.add(item)
+                db.session.flush()
+                db.session.expunge(item)
+                seq += 1
+            timer.items = seq
+
+        if seq == 0:
+            db.session.rollback()
+            flash("No PDF resumes found in the upload.", "danger")
+            return redirect(request.url)
+        for follower in followers:
+            db.session.execute(
+                db.insert(ScreeningJobItem).from_select(
+                    ["job_id", "seq", "file_name", "pdf_data"],
+                    db.select(
+                        db.literal(follower.id),
+                        ScreeningJobItem.seq,
+                        ScreeningJobItem.file_name,
+                        db.literal(b""),
+                    ).where(ScreeningJobItem.job_id == job.id),
+                )
+            )
+        job.upload_seconds = timer.seconds
+        db.session.commit()
+
+        if request.accept_mimetypes.best == "application/json":
+            return (
+                jsonify(
+                    {
+                        "job_id": job.id,
+                        "job_ids": [each.id for each in (job, *followers)],
+                        "skipped": skipped,
+                    }
+                ),
+                202,
+            )
+        if skipped:
+            names = ", ".join(
+                f"{file['file_name']} ({file['reason']})" for file in skipped[:10]
+            )
+            more = f" and {len(skipped) - 10} more" if len(skipped) > 10 else ""
+            flash(f"Skipped {len(skipped)} files: {names}{more}", "warning")
+        if followers:
+            return redirect(url_for("screener.position_matrix", job_id=job.id))
+        return redirect(url_for("screener.job_results", job_id=job.id))
     positions = Position.query.all()
     return render_template("index.html", positions=positions)
 
 
+app = create_app()
+
 if __name__ == "__main__":
     app.run(debug=True)
@@ -0,0 +1,190 @@
+import os
+import json
+import uuid
+from types import SimpleNamespace
+import tempfile
+from openai.types.chat import ChatCompletion
+from functions import MODEL_NAME, parse_evaluation
+from metrics import count_llm_tokens
+from evaluators import get_evaluator, OpenAIEvaluator
+
+BATCH_ENDPOINT = "/v1/chat/completions"
+
+
+class LocalBatchClient:
+    """
+    File-based stand-in for the OpenAI Files and Batches APIs.
+
+    Input, output and batch state live as files in `directory`. A batch is
+    processed when it is first retrieved, by passing each request body to
+    `responder`, which must return a chat completion as a dict. By default the
+    requests are forwarded to the configured evaluator one by one.
+    """
+
+    def __init__(self, directory, responder=None):
+        self.directory = directory
+        self.responder = responder or (
+            lambda body: get_evaluator().complete(body).model_dump()
+        )
+        os.makedirs(directory, exist_ok=True)
+        self.files = SimpleNamespace(create=self.create_file, content=self.file_content)
+        self.batches = SimpleNamespace(
+            create=self.create_batch, retrieve=self.retrieve_batch
+        )
+
+    def path(self, name):
+        return os.path.join(self.directory, name)
+
+    def create_file(self, file, purpose):
+        file_id = f"file-{uuid.uuid4().hex}"
+        with open(self.path(file_id), "wb") as f:
+            f.write(file.read())
+        return SimpleNamespace(id=file_id, purpose=purpose)
+
+    def file_content(self, file_id):
+        with open(self.path(file_id), "rb") as f:
+            content = f.read()
+        return SimpleNamespace(content=content, text=content.decode("utf-8"))
+
+    def create_batch(self, input_file_id, endpoint, completion_window):
+        batch = {
+            "id": f"batch_{uuid.uuid4().hex}",
+            "status": "in_progress",
+            "input_file_id": input_file_id,
+            "output_file_id": None,
+            "error_file_id": None,
+            "endpoint": endpoint,
+            "completion_window": completion_window,
+        }
+        self.save_batch(batch)
+        return SimpleNamespace(**batch)
+
+    def save_batch(self, batch):
+        with open(self.path(f"{batch['id']}.json"), "w") as f:
+            json.dump(batch, f)
+
+    def retrieve_batch(self, batch_id):
+        with open(self.path(f"{batch_id}.json")) as f:
+            batch = json.load(f)
+        if batch["status"] == "in_progress":
+            self.run_batch(batch)
+        return SimpleNamespace(**batch)
+
+    def run_batch(self, batch):
+        outputs, errors = [], []
+        for line in self.file_content(batch["input_file_id"]).text.splitlines():
+            request = json.loads(line)
+            try:
+                body = self.responder(request["body"])
+                outputs.append(
+                    {
+                        "custom_id": request["custom_id"],
+                        "response": {"status_code": 200, "body": body},
+                        "error": None,
+                    }
+                )
+            except Exception as e:
+                errors.append(
+                    {
+                        "custom_id": request["custom_id"],
+                        "response": None,
+                        "error": {"code": "local_error", "message": str(e)},
+                    }
+                )
+
+        for key, lines in (("output_file_id", outputs), ("error_file_id", errors)):
+            if lines:
+                content = "\n".join(json.dumps(line) for line in lines).encode()
+                batch[key] = self.create_file(
+                    SimpleNamespace(read=lambda: content), purpose="batch_output"
+                ).id
+        batch["status"] = "completed"
+        self.save_batch(batch)
+
+
+def get_batch_client(local_directory=None):
+    """
+    Returns the client used for batch screening.
+
+    Args:
+        local_directory (str, optional): Use a LocalBatchClient storing its
+            files here instead of the OpenAI API.
+    """
+    evaluator = get_evaluator()
+    if not local_directory and not isinstance(evaluator, OpenAIEvaluator):
+        # Other backends have no Batch API; emulate it locally
+        local_directory = os.path.join(tempfile.gettempdir(), "screener-local-batches")
+    if local_directory:
+        return LocalBatchClient(local_directory)
+    return evaluator.client
+
+
+def write_batch_file(path, requests):
+    """
+    Writes chat completion requests as a Batch API input file.
+
+    Args:
+        path (str): Where to write the JSONL file.
+        requests (dict): Mapping of custom_id to build_chat_request output.
+    """
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        for custom_id, body in requests.items():
+            line = {
+                "custom_id": str(custom_id),
+                "method": "POST",
+                "url": BATCH_ENDPOINT,
+                "body": body,
+            }
+            f.write(json.dumps(line, ensure_ascii=False) + "\n")
+
+
+def submit_batch(batch_client, path):
+    """
+    Uploads a batch input file and starts the batch.
+
+    Returns:
+        str: ID of the created batch.
+    """
+    with open(path, "rb") as f:
+        input_file = batch_client.files.create(file=f, purpose="batch")
+    batch = batch_client.batches.create(
+        input_file_id=input_file.id,
+        endpoint=BATCH_ENDPOINT,
+        completion_window="24h",
+    )
+    return batch.id
+
+
+def read_batch_results(batch_client, batch):
+    """
+    Downloads a finished batch's output and error files.
+
+    Args:
+        batch_client: OpenAI client or LocalBatchClient.
+        batch: The batch object from batches.retrieve.
+
+    Returns:
+        dict: Mapping of custom_id to the parsed evaluation (or error) dict.
+    """
+    results = {}
+    for file_id in (batch.output_file_id, batch.error_file_id):
+        if not file_id:
+            continue
+        for line in batch_client.files.content(file_id).text.splitlines():
+            if not line.strip():
+                continue
+            output = json.loads(line)
+            response = output.get("response") or {}
+            if output.get("error") or response.get("status_code") != 200:
+                error = output.get("error") or response.get("body", {}).get("error")
+                results[output["custom_id"]] = {
+                    "error": (error or {}).get("message", "Batch request failed.")
+                }
+            else:
+                result = parse_evaluation(
+                    ChatCompletion.model_validate(response["body"])
+                )
+                count_llm_tokens(result["usage"], MODEL_NAME)
+                results[output["custom_id"]] = result
+    return results
@@ -0,0 +1,74 @@
+"""
+Measures the cold start of the web app: the time a fresh interpreter takes
+to import app.py, and the modules contributing most to it.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_import --runs 10
+"""
+
+import os
+import sys
+import argparse
+import statistics
+import subprocess
+
+
+def time_import(module):
+    """
+    Imports `module` in a fresh interpreter with -X importtime.
+
+    Returns:
+        tuple: (total seconds, {top-level module: cumulative seconds}).
+    """
+    output = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True,
+        text=True,
+        check=True,
+        env={**os.environ, "API_KEY": os.getenv("API_KEY", "unused")},
+    ).stderr
+    modules = {}
+    for line in output.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:") :].split("|")
+        name = name[1:]
+        # Only direct imports of the measured module, indented by two spaces
+        if name.startswith("   ") or not name.startswith("  "):
+            continue
+        modules[name.strip()] = int(cumulative) / 1e6
+    total = next(
+        int(line.split("|")[1]) / 1e6
+        for line in reversed(output.splitlines())
+        if line.rstrip().endswith(f"| {module}")
+    )
+    return total, modules
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--module", default="app", help="Module to import.")
+    parser.add_argument("--runs", type=int, default=5, help="Fresh interpreters.")
+    parser.add_argument("--top", type=int, default=10, help="Modules to list.")
+    args = parser.parse_args()
+
+    totals = []
+    modules = {}
+    for _ in range(args.runs):
+        total, run_modules = time_import(args.module)
+        totals.append(total)
+        for name, seconds in run_modules.items():
+            modules.setdefault(name, []).append(seconds)
+
+    print(
+        f"import {args.module}: median {statistics.median(totals):.3f}s, "
+        f"min {min(totals):.3f}s over {args.runs} runs"
+    )
+    slowest = sorted(modules.items(), key=lambda item: -statistics.median(item[1]))
+    for name, seconds in slowest[: args.top]:
+        print(f"  {statistics.median(seconds):8.3f}s  {name}")
+
+
+if __name__ == "__main__":
+    main()
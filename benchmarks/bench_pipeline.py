@@ -0,0 +1,173 @@
+"""
+Times each stage of the screening pipeline on synthetic resumes, using the
+fake evaluator so runs are free, offline and repeatable.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_pipeline --sizes 10,100,1000 --latency 0.5
+    python -m benchmarks.bench_pipeline --output before.json
+    python -m benchmarks.bench_pipeline --compare before.json
+"""
+
+import os
+import json
+import time
+import argparse
+import tempfile
+from compaction import compact_resume
+from evaluators import FakeEvaluator, set_evaluator
+from export import stream_csv, write_xlsx
+from functions import (
+    build_instructions,
+    extract_texts,
+    iter_evaluations,
+    preprocess_resume,
+    score_batch,
+)
+from benchmarks.synthetic import QUALIFICATIONS, QUALIFICATION_SCORE, make_corpus
+
+STAGES = ["extract", "preprocess", "evaluate", "score", "export"]
+
+
+def run_pipeline(pdf_blobs, args):
+    """
+    Runs the pipeline once, the way the worker does.
+
+    Args:
+        pdf_blobs (list): Resume PDFs.
+        args (argparse.Namespace): Benchmark options.
+
+    Returns:
+        dict: Seconds spent in each stage.
+    """
+    timings = {}
+    qualifications = [
+        QUALIFICATIONS["Minimum Qualification"],
+        QUALIFICATIONS["Preferred Qualification"],
+        QUALIFICATIONS["Added Value"],
+    ]
+
+    start = time.perf_counter()
+    extracted = extract_texts(pdf_blobs, max_workers=args.extraction_workers)
+    timings["extract"] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    resumes = []
+    for resume_text, error in extracted:
+        if error is not None:
+            continue
+        if args.token_budget:
+            resume_text, _ = compact_resume(resume_text, args.token_budget)
+        resumes.append(preprocess_resume(resume_text))
+    timings["preprocess"] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    results = [None] * len(resumes)
+    for index, result in iter_evaluations(
+        resumes,
+        *qualifications,
+        max_workers=args.concurrency,
+        instructions=build_instructions(*qualifications),
+    ):
+        results[index] = result
+    results = [result for result in results if "error" not in result]
+    timings["evaluate"] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    scores = score_batch(
+        results,
+        QUALIFICATION_SCORE,
+        file_names=[f"resume_{index}.pdf" for index in range(len(results))],
+    ).reset_index()
+    timings["score"] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    columns = [(str(name), "string") for name in scores.columns]
+    rows = [tuple(map(str, row)) for row in scores.itertuples(index=False)]
+    chunks = [rows[i : i + 500] for i in range(0, len(rows), 500)]
+    with tempfile.TemporaryDirectory() as tmp:
+        write_xlsx(os.path.join(tmp, "results.xlsx"), columns, chunks)
+    for _ in stream_csv(columns, chunks):
+        pass
+    timings["export"] = time.perf_counter() - start
+    return timings
+
+
+def compare(results, baseline, tolerance):
+    """
+    Lists the stages that got slower than the baseline by more than
+    `tolerance` (a fraction). Differences under 10 ms are timer noise.
+    """
+    regressions = []
+    for size, timings in results.items():
+        for stage, seconds in timings.items():
+            before = baseline.get(size, {}).get(stage)
+            if before and seconds > max(before * (1 + tolerance), before + 0.01):
+                regressions.append(
+                    f"{size} resumes, {stage}: {before:.3f}s -> {seconds:.3f}s"
+                )
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument(
+        "--sizes", default="10,100,1000", help="Comma-separated corpus sizes."
+    )
+    parser.add_argument(
+        "--latency", type=float, default=0.0, help="Fake API latency in seconds."
+    )
+    parser.add_argument(
+        "--error-rate", type=float, default=0.0, help="Share of fake 429s."
+    )
+    parser.add_argument(
+        "--concurrency", type=int, default=8, help="Concurrent evaluations."
+    )
+    parser.add_argument("--extraction-workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument(
+        "--token-budget",
+        type=int,
+        default=3000,
+        help="Compaction budget; 0 skips compaction, which needs tiktoken's encodings.",
+    )
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="Write the timings to this JSON file.")
+    parser.add_argument(
+        "--compare", help="Baseline JSON file from an earlier --output."
+    )
+    parser.add_argument(
+        "--tolerance", type=float, default=0.2, help="Allowed slowdown."
+    )
+    args = parser.parse_args()
+
+    set_evaluator(
+        FakeEvaluator(latency=args.latency, error_rate=args.error_rate, seed=args.seed)
+    )
+
+    results = {}
+    print(f"{'resumes':>8} " + " ".join(f"{stage:>18}" for stage in STAGES))
+    for size in [int(size) for size in args.sizes.split(",")]:
+        timings = run_pipeline(make_corpus(size, args.seed), args)
+        results[str(size)] = timings
+        print(
+            f"{size:>8} "
+            + " ".join(
+                f"{timings[stage]:>8.3f}s {size / max(timings[stage], 1e-9):>7.0f}/s"
+                for stage in STAGES
+            )
+        )
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+    if args.compare:
+        with open(args.compare) as f:
+            regressions = compare(results, json.load(f), args.tolerance)
+        for regression in regressions:
+            print(f"Slower: {regression}")
+        if regressions:
+            raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
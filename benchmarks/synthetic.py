@@ -0,0 +1,195 @@
+import random
+import fitz
+
+FIRST_NAMES = [
+    "Alex",
+    "Maria",
+    "James",
+    "Aisha",
+    "Wei",
+    "Carlos",
+    "Emily",
+    "Omar",
+    "Priya",
+    "Daniel",
+    "Sofia",
+    "Kwame",
+    "Hannah",
+    "Mateo",
+    "Yuki",
+    "Grace",
+]
+LAST_NAMES = [
+    "Johnson",
+    "Garcia",
+    "Smith",
+    "Khan",
+    "Chen",
+    "Lopez",
+    "Brown",
+    "Haddad",
+    "Patel",
+    "Miller",
+    "Rossi",
+    "Mensah",
+    "Schmidt",
+    "Silva",
+    "Tanaka",
+    "Lee",
+]
+TITLES = [
+    "Teacher",
+    "School Administrator",
+    "Curriculum Coordinator",
+    "Counselor",
+    "Software Engineer",
+    "Data Analyst",
+    "Project Manager",
+    "Office Manager",
+]
+SKILLS = [
+    "classroom management",
+    "lesson planning",
+    "budgeting",
+    "Python",
+    "SQL",
+    "stakeholder communication",
+    "special education",
+    "Microsoft Office",
+    "team leadership",
+    "data analysis",
+    "curriculum design",
+    "scheduling",
+    "conflict resolution",
+    "grant writing",
+    "public speaking",
+    "Excel",
+]
+VERBS = [
+    "Led",
+    "Managed",
+    "Designed",
+    "Improved",
+    "Coordinated",
+    "Developed",
+    "Supervised",
+    "Implemented",
+    "Organized",
+    "Mentored",
+]
+OBJECTS = [
+    "a team of {n} staff",
+    "the annual budget of ${n}k",
+    "{n} student programs",
+    "onboarding for {n} new hires",
+    "a reporting process used by {n} people",
+    "parent outreach across {n} schools",
+    "{n} cross-functional projects",
+]
+QUALIFICATIONS = {
+    "Minimum Qualification": [
+        "Bachelor's degree in education or a related field",
+        "At least three years of classroom or administrative experience",
+        "Valid state teaching or administrator certification",
+    ],
+    "Preferred Qualification": [
+        "Master's degree in educational leadership",
+        "Experience managing a school budget",
+        "Experience with special education programs",
+    ],
+    "Added Value": [
+        "Bilingual in English and Spanish",
+        "Experience writing grants",
+    ],
+}
+QUALIFICATION_SCORE = {
+    "Minimum Qualification": 3,
+    "Preferred Qualification": 2,
+    "Added Value": 1,
+}
+LINES_PER_PAGE = 50
+
+
+def make_resume_text(index, seed=0):
+    """
+    Builds the text of a plausible, deterministic resume.
+
+    Args:
+        index (int): Position of the resume in the corpus.
+        seed (int): Corpus seed.
+
+    Returns:
+        str: Resume text, one line per printed line.
+    """
+    rng = random.Random(seed * 1_000_003 + index)
+    first, last = rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES)
+    lines = [
+        f"{first} {last}",
+        f"{first.lower()}.{last.lower()}{index}@example.com | (555) 010-{index % 10000:04d}",
+        "",
+        "Summary",
+        f"{rng.choice(TITLES)} with {rng.randint(1, 20)} years of experience in "
+        f"{rng.choice(SKILLS)} and {rng.choice(SKILLS)}.",
+        "",
+        "Experience",
+    ]
+    for job in range(rng.randint(2, 6)):
+        start = rng.randint(1995, 2020)
+        lines.append(
+            f"{rng.choice(TITLES)}, Example Org {rng.randint(1, 500)} "
+            f"({start} - {start + rng.randint(1, 5)})"
+        )
+        for _ in range(rng.randint(3, 6)):
+            obj = rng.choice(OBJECTS).format(n=rng.randint(2, 200))
+            lines.append(f"- {rng.choice(VERBS)} {obj}")
+    lines += [
+        "",
+        "Education",
+        rng.choice(
+            [
+                "Bachelor of Arts in Education, State University",
+                "Master of Education in Educational Leadership, State University",
+                "Bachelor of Science in Computer Science, Tech Institute",
+            ]
+        ),
+        "",
+        "Skills",
+        ", ".join(rng.sample(SKILLS, 6)),
+    ]
+    if rng.random() < 0.1:
+        lines += ["", "Military Service", "U.S. Army, 4 years"]
+    return "\n".join(lines)
+
+
+def make_pdf(text):
+    """
+    Renders resume text as a PDF, starting a new page every LINES_PER_PAGE
+    lines.
+
+    Returns:
+        bytes: The PDF file.
+    """
+    document = fitz.open()
+    lines = text.splitlines()
+    for start in range(0, len(lines), LINES_PER_PAGE):
+        page = document.new_page()
+        page.insert_text(
+            (50, 50), "\n".join(lines[start : start + LINES_PER_PAGE]), fontsize=10
+        )
+    data = document.tobytes()
+    document.close()
+    return data
+
+
+def make_corpus(size, seed=0):
+    """
+    Generates a corpus of synthetic resume PDFs.
+
+    Args:
+        size (int): Number of resumes.
+        seed (int): Corpus seed; the same seed gives the same corpus.
+
+    Returns:
+        list: PDF bytes per resume.
+    """
+    return [make_pdf(make_resume_text(index, seed)) for index in range(size)]
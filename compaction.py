@@ -0,0 +1,219 @@
+import re
+from collections import Counter
+from functools import lru_cache
+import tiktoken
+from functions import MODEL_NAME, PAGE_BREAK
+
+# Sections that rarely decide a qualification, dropped first (in this order)
+# when a resume is over its token budget
+LOW_VALUE_SECTIONS = [
+    "references",
+    "hobbies",
+    "interests",
+    "personal interests",
+    "personal information",
+    "personal details",
+    "publications",
+    "presentations",
+    "conferences",
+]
+
+SECTION_HEADINGS = set(LOW_VALUE_SECTIONS) | {
+    "summary",
+    "profile",
+    "professional summary",
+    "objective",
+    "experience",
+    "work experience",
+    "professional experience",
+    "employment history",
+    "work history",
+    "education",
+    "skills",
+    "technical skills",
+    "certifications",
+    "licenses",
+    "licenses and certifications",
+    "projects",
+    "awards",
+    "honors",
+    "military service",
+    "volunteer experience",
+    "languages",
+}
+
+# Lines shorter than this are left alone by de-duplication, since short lines
+# such as dates or job titles legitimately repeat
+MIN_DEDUPE_LINE_LENGTH = 25
+EDGE_LINES = 3
+
+
+# Rough size of a token, for when tiktoken's encodings can't be loaded
+CHARS_PER_TOKEN = 4
+
+
+class CharEncoding:
+    """
+    Stand-in for a tiktoken encoding that counts every CHARS_PER_TOKEN
+    characters as one token, so budgets still roughly hold.
+    """
+
+    def encode(self, text):
+        return [
+            text[i : i + CHARS_PER_TOKEN] for i in range(0, len(text), CHARS_PER_TOKEN)
+        ]
+
+    def decode(self, tokens):
+        return "".join(tokens)
+
+
+@lru_cache(maxsize=None)
+def get_encoding(model=MODEL_NAME):
+    """
+    Returns the tokenizer of a model.
+
+    tiktoken downloads its encoding files on first use; point
+    TIKTOKEN_CACHE_DIR at a pre-filled directory on hosts without network
+    access. If they still can't be loaded, tokens are estimated from the
+    number of characters.
+    """
+    try:
+        try:
+            return tiktoken.encoding_for_model(model)
+        except KeyError:
+            return tiktoken.get_encoding("o200k_base")
+    except Exception as e:
+        print(
+            f"Warning: could not load the {model} tokenizer ({e}); "
+            f"estimating {CHARS_PER_TOKEN} characters per token."
+        )
+        return CharEncoding()
+
+
+def count_tokens(text, model=MODEL_NAME):
+    return len(get_encoding(model).encode(text))
+
+
+def normalize_line(line):
+    return " ".join(line.split()).casefold()
+
+
+def edge_key(line):
+    # Digits are masked so running headers such as "Page 2 of 5" compare equal
+    return re.sub(r"\d+", "#", normalize_line(line))
+
+
+def remove_repeated_edges(pages):
+    """
+    Drops header and footer lines that repeat across pages, keeping their
+    first occurrence.
+
+    Args:
+        pages (list): Lines of each page.
+
+    Returns:
+        list: Lines of each page without the repeated headers and footers.
+    """
+    if len(pages) < 2:
+        return pages
+
+    def edge_positions(lines):
+        filled = [i for i, line in enumerate(lines) if line.strip()]
+        return set(filled[:EDGE_LINES] + filled[-EDGE_LINES:])
+
+    counts = Counter()
+    for lines in pages:
+        counts.update({edge_key(lines[i]) for i in edge_positions(lines)})
+    threshold = max(2, (len(pages) + 1) // 2)
+    repeated = {line for line, count in counts.items() if count >= threshold}
+
+    seen = set()
+    compacted = []
+    for lines in pages:
+        edges = edge_positions(lines)
+        kept = []
+        for i, line in enumerate(lines):
+            key = edge_key(line)
+            if i in edges and key in repeated:
+                if key in seen:
+                    continue
+                seen.add(key)
+            kept.append(line)
+        compacted.append(kept)
+    return compacted
+
+
+def remove_duplicate_lines(lines):
+    # Compared with their numbers, as lines differing only in dates or
+    # figures are separate jobs or achievements
+    seen = set()
+    kept = []
+    for line in lines:
+        key = normalize_line(line)
+        if len(key) >= MIN_DEDUPE_LINE_LENGTH:
+            if key in seen:
+                continue
+            seen.add(key)
+        kept.append(line)
+    return kept
+
+
+def section_heading(line):
+    heading = line.strip().rstrip(":").casefold()
+    return heading if heading in SECTION_HEADINGS else None
+
+
+def drop_section(lines, name):
+    """
+    Removes a section, from its heading up to the next known heading.
+    """
+    kept = []
+    dropping = False
+    for line in lines:
+        heading = section_heading(line)
+        if heading is not None:
+            dropping = heading == name
+        if not dropping:
+            kept.append(line)
+    return kept
+
+
+def compact_resume(resume_text, token_budget=None, model=MODEL_NAME):
+    """
+    Shrinks resume text before it is sent to the model.
+
+    Repeated page headers and footers and duplicate lines are always removed.
+    If the result is still over token_budget, low-value sections are dropped
+    and finally the text is truncated to the budget.
+
+    Args:
+        resume_text (str): Extracted resume text, pages separated by PAGE_BREAK.
+        token_budget (int, optional): Maximum number of tokens to keep.
+        model (str): Model whose tokenizer counts the tokens.
+
+    Returns:
+        tuple: (compacted text, {"tokens_before": int, "tokens_after": int}).
+    """
+    tokens_before = count_tokens(resume_text, model)
+
+    pages = [page.splitlines() for page in resume_text.split(PAGE_BREAK)]
+    lines = [line for page in remove_repeated_edges(pages) for line in page]
+    lines = remove_duplicate_lines(lines)
+    compacted = "\n".join(lines)
+
+    if token_budget is not None:
+        for name in LOW_VALUE_SECTIONS:
+            if count_tokens(compacted, model) <= token_budget:
+                break
+            lines = drop_section(lines, name)
+            compacted = "\n".join(lines)
+
+        encoding = get_encoding(model)
+        tokens = encoding.encode(compacted)
+        if len(tokens) > token_budget:
+            compacted = encoding.decode(tokens[:token_budget])
+
+    return compacted, {
+        "tokens_before": tokens_before,
+        "tokens_after": count_tokens(compacted, model),
+    }
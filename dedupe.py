@@ -0,0 +1,165 @@
+import re
+import hashlib
+import numpy as np
+
+NUM_PERMUTATIONS = 64
+LSH_BANDS = 16
+SHINGLE_SIZE = 5
+NEAR_DUPLICATE_THRESHOLD = 0.8
+MISSING_EMAIL = "Email not found"
+
+
+def content_hash(resume_text):
+    """
+    Hashes resume text, ignoring case and whitespace differences.
+
+    Args:
+        resume_text (str): Cleaned resume text.
+
+    Returns:
+        str: Hex SHA-256 digest.
+    """
+    normalized = " ".join(resume_text.casefold().split())
+    return hashlib.sha256(normalized.encode("utf-8")).hexdigest()
+
+
+def normalize_email(email):
+    """
+    Returns the lowercased email, or None if preprocess_resume found none.
+    """
+    if not email or email == MISSING_EMAIL:
+        return None
+    return email.strip(".").casefold()
+
+
+def shingle_hashes(resume_text, size=SHINGLE_SIZE):
+    """
+    Hashes every run of `size` consecutive words of the text.
+
+    Returns:
+        np.ndarray: Unique 64-bit shingle hashes.
+    """
+    words = re.findall(r"\w+", resume_text.casefold())
+    shingles = {" ".join(words[i : i + size]) for i in range(len(words) - size + 1)}
+    return np.array(
+        [
+            int.from_bytes(
+                hashlib.blake2b(shingle.encode("utf-8"), digest_size=8).digest(),
+                "little",
+            )
+            for shingle in shingles
+        ],
+        dtype=np.uint64,
+    )
+
+
+class MinHasher:
+    """
+    MinHash signatures, whose fraction of equal positions estimates the
+    Jaccard similarity of two texts' shingle sets.
+    """
+
+    def __init__(self, num_permutations=NUM_PERMUTATIONS, seed=1):
+        # Fixed seed so signatures stored in the database stay comparable
+        rng = np.random.default_rng(seed)
+        self.a = rng.integers(1, 2**63, num_permutations, dtype=np.uint64) | 1
+        self.b = rng.integers(0, 2**63, num_permutations, dtype=np.uint64)
+
+    def signature(self, resume_text):
+        """
+        Args:
+            resume_text (str): Cleaned resume text.
+
+        Returns:
+            np.ndarray: The signature, or None if the text is too short to
+                have any shingles.
+        """
+        hashes = shingle_hashes(resume_text)
+        if not len(hashes):
+            return None
+        # Multiply-shift hashing; uint64 arithmetic wraps modulo 2**64
+        with np.errstate(over="ignore"):
+            permuted = (self.a[:, None] * hashes[None, :] + self.b[:, None]) >> 32
+        return permuted.min(axis=1)
+
+
+class DuplicateDetector:
+    """
+    Finds resumes that duplicate one already added, by identical content,
+    identical email, or a MinHash similarity of at least `threshold`.
+
+    Near-duplicate candidates are looked up with locality-sensitive hashing:
+    signatures are split into bands and only resumes sharing a whole band
+    with the query are compared.
+    """
+
+    def __init__(
+        self,
+        threshold=NEAR_DUPLICATE_THRESHOLD,
+        num_permutations=NUM_PERMUTATIONS,
+        bands=LSH_BANDS,
+    ):
+        self.threshold = threshold
+        self.hasher = MinHasher(num_permutations)
+        self.rows = num_permutations // bands
+        self.bands = bands
+        self.by_hash = {}
+        self.by_email = {}
+        self.buckets = [{} for _ in range(bands)]
+        self.signatures = {}
+
+    def signature(self, resume_text):
+        return self.hasher.signature(resume_text)
+
+    def band_keys(self, signature):
+        return [
+            signature[band * self.rows : (band + 1) * self.rows].tobytes()
+            for band in range(self.bands)
+        ]
+
+    def add(self, key, resume_hash, email, signature):
+        """
+        Registers a canonical resume.
+
+        Args:
+            key: Identifier returned by match, e.g. the job item.
+            resume_hash (str): Output of content_hash.
+            email (str): Output of normalize_email, or None.
+            signature (np.ndarray): MinHash signature, or None.
+        """
+        self.by_hash.setdefault(resume_hash, key)
+        if email:
+            self.by_email.setdefault(email, key)
+        if signature is not None:
+            self.signatures[key] = signature
+            for bucket, band_key in zip(self.buckets, self.band_keys(signature)):
+                bucket.setdefault(band_key, []).append(key)
+
+    def match(self, resume_hash, email, signature):
+        """
+        Looks for a registered resume this one duplicates.
+
+        Returns:
+            tuple: (key, reason) of the canonical resume, or None.
+        """
+        if resume_hash in self.by_hash:
+            return self.by_hash[resume_hash], "identical resume"
+        if email and email in self.by_email:
+            return self.by_email[email], "same email"
+        if signature is None:
+            return None
+
+        # dict rather than set so ties are broken the same way on every run
+        candidates = dict.fromkeys(
+            key
+            for bucket, band_key in zip(self.buckets, self.band_keys(signature))
+            for key in bucket.get(band_key, ())
+        )
+        best = None
+        for key in candidates:
+            similarity = float(np.mean(self.signatures[key] == signature))
+            if similarity >= self.threshold and (best is None or similarity > best[1]):
+                best = (key, similarity)
+        if best is None:
+            return None
+        return best[0], f"near-duplicate ({best[1]:.0%} similar)"
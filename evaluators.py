@@ -0,0 +1,217 @@
+import os
+import re
+import json
+import time
+import random
+import hashlib
+import threading
+
+QUALIFICATION_HEADINGS = {
+    "Minimum Qualifications:": "Minimum Qualification",
+    "Preferred Qualifications:": "Preferred Qualification",
+    "Added Value:": "Added Value",
+}
+
+
+class Evaluator:
+    """
+    Backend that answers the chat completion requests built by
+    functions.build_chat_request.
+    """
+
+    def complete(self, request):
+        """
+        Args:
+            request (dict): Keyword arguments of a chat completion request.
+
+        Returns:
+            ChatCompletion: The model's answer.
+        """
+        raise NotImplementedError
+
+
+class OpenAIEvaluator(Evaluator):
+    """
+    Sends requests to the OpenAI API. The client is created on first use, so
+    importing the app doesn't require an API key.
+    """
+
+    def __init__(self, client=None):
+        self._client = client
+        self._lock = threading.Lock()
+
+    @property
+    def client(self):
+        with self._lock:
+            if self._client is None:
+                # Imported on first use; the openai package is slow to import
+                from openai import OpenAI
+
+                # Retries are done by check_requirements, which also feeds
+                # the circuit breaker
+                self._client = OpenAI(api_key=os.getenv("API_KEY"), max_retries=0)
+            return self._client
+
+    def complete(self, request):
+        return self.client.chat.completions.create(**request)
+
+
+class FakeEvaluator(Evaluator):
+    """
+    Deterministic local stand-in for the OpenAI API, for development and
+    benchmarks.
+
+    Whether a qualification is met depends only on the qualification and the
+    resume text, so repeated runs give the same rankings. Latency, transient
+    failures and answer size can be tuned to mimic the real service.
+
+    Args:
+        latency (float): Seconds each request takes.
+        error_rate (float): Share of requests failing with a 429 rate limit.
+        explanation_words (int): Length of every explanation, which sets the
+            size of the answer.
+        seed (int): Seed of the failure sequence.
+    """
+
+    def __init__(self, latency=0.0, error_rate=0.0, explanation_words=12, seed=0):
+        self.latency = latency
+        self.error_rate = error_rate
+        self.explanation_words = explanation_words
+        self.rng = random.Random(seed)
+        self.lock = threading.Lock()
+
+    def parse_qualifications(self, instructions):
+        qualifications = []
+        qualification_type = None
+        for line in instructions.splitlines():
+            line = line.strip()
+            if line in QUALIFICATION_HEADINGS:
+                qualification_type = QUALIFICATION_HEADINGS[line]
+            elif line == "---":
+                qualification_type = None
+            elif qualification_type and line.startswith("- "):
+                qualifications.append((qualification_type, line[2:]))
+        return qualifications
+
+    def complete(self, request):
+        if self.latency:
+            time.sleep(self.latency)
+        with self.lock:
+            failed = self.rng.random() < self.error_rate
+        if failed:
+            import httpx
+            import openai
+
+            raise openai.RateLimitError(
+                "Fake rate limit.",
+                response=httpx.Response(
+                    429,
+                    headers={"retry-after": "0"},
+                    request=httpx.Request("POST", "https://fake.invalid"),
+                ),
+                body=None,
+            )
+
+        instructions, resume = (
+            message["content"] for message in request["messages"][:2]
+        )
+        email = re.search(r"^Email: (.*)$", resume, re.M)
+        words = resume.split("Resume:", 1)[-1].split()
+        explanation = " ".join(["Fake", "explanation"] * self.explanation_words)
+        explanation = " ".join(explanation.split()[: self.explanation_words])
+
+        def met(text):
+            digest = hashlib.sha256(f"{text}\n{resume}".encode("utf-8")).digest()
+            return digest[0] % 2 == 0
+
+        content = json.dumps(
+            {
+                "name": " ".join(words[:2]) or "Name not found",
+                "email": email.group(1) if email else "Email not found",
+                "summarization": " ".join(words[:40]),
+                "is_veteran": met("veteran"),
+                "qualifications": [
+                    {
+                        "qualification_type": qualification_type,
+                        "qualification": qualification,
+                        "true_or_false": met(qualification),
+                        "explanation": explanation,
+                    }
+                    for qualification_type, qualification in self.parse_qualifications(
+                        instructions
+                    )
+                ],
+            }
+        )
+        # Rough token counts, about four characters per token
+        prompt_tokens = (len(instructions) + len(resume)) // 4
+        from openai.types.chat import ChatCompletion
+
+        return ChatCompletion.model_validate(
+            {
+                "id": "chatcmpl-fake",
+                "object": "chat.completion",
+                "created": int(time.time()),
+                "model": request["model"],
+                "choices": [
+                    {
+                        "index": 0,
+                        "finish_reason": "stop",
+                        "message": {"role": "assistant", "content": content},
+                    }
+                ],
+                "usage": {
+                    "prompt_tokens": prompt_tokens,
+                    "completion_tokens": len(content) // 4,
+                    "total_tokens": prompt_tokens + len(content) // 4,
+                },
+            }
+        )
+
+
+def create_evaluator(backend):
+    """
+    Builds an evaluator from its name.
+
+    Args:
+        backend (str): "openai" or "fake". The fake backend is configured with
+            FAKE_EVALUATOR_LATENCY, FAKE_EVALUATOR_ERROR_RATE and
+            FAKE_EVALUATOR_EXPLANATION_WORDS.
+
+    Returns:
+        Evaluator: The backend.
+    """
+    if backend == "openai":
+        return OpenAIEvaluator()
+    if backend == "fake":
+        return FakeEvaluator(
+            latency=float(os.getenv("FAKE_EVALUATOR_LATENCY", 0)),
+            error_rate=float(os.getenv("FAKE_EVALUATOR_ERROR_RATE", 0)),
+            explanation_words=int(os.getenv("FAKE_EVALUATOR_EXPLANATION_WORDS", 12)),
+        )
+    raise ValueError(f"Unknown evaluator backend: {backend}")
+
+
+_evaluator = None
+_evaluator_lock = threading.Lock()
+
+
+def get_evaluator():
+    """
+    Returns the process-wide evaluator, chosen by EVALUATOR_BACKEND
+    (default "openai").
+    """
+    global _evaluator
+    with _evaluator_lock:
+        if _evaluator is None:
+            _evaluator = create_evaluator(os.getenv("EVALUATOR_BACKEND", "openai"))
+        return _evaluator
+
+
+def set_evaluator(evaluator):
+    """
+    Replaces the process-wide evaluator, e.g. with a FakeEvaluator.
+    """
+    global _evaluator
+    with _evaluator_lock:
+        _evaluator = evaluator
@@ -0,0 +1,85 @@
+import io
+import csv
+
+EXPORT_FORMATS = {
+    "xlsx": "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+    "csv": "text/csv",
+    "parquet": "application/vnd.apache.parquet",
+}
+
+
+def stream_csv(columns, chunks):
+    """
+    Generates a CSV export one chunk of rows at a time.
+
+    Args:
+        columns (list): (name, type) pairs, type being "string", "bool" or
+            "float".
+        chunks (iterable): Lists of row tuples.
+
+    Yields:
+        str: CSV text, starting with the header line.
+    """
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow([name for name, _ in columns])
+    for rows in chunks:
+        writer.writerows(rows)
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+    yield buffer.getvalue()
+
+
+def write_xlsx(path, columns, chunks):
+    """
+    Writes an XLSX export with openpyxl's write-only mode, which flushes rows
+    to disk as they are appended instead of keeping the sheet in memory.
+
+    Args:
+        path (str): Where to write the workbook.
+        columns (list): (name, type) pairs.
+        chunks (iterable): Lists of row tuples.
+    """
+    from openpyxl import Workbook
+
+    workbook = Workbook(write_only=True)
+    sheet = workbook.create_sheet("Results")
+    sheet.append([name for name, _ in columns])
+    for rows in chunks:
+        for row in rows:
+            sheet.append(row)
+    workbook.save(path)
+
+
+def write_parquet(path, columns, chunks):
+    """
+    Writes a Parquet export with one row group per chunk.
+
+    Args:
+        path (str): Where to write the file.
+        columns (list): (name, type) pairs.
+        chunks (iterable): Lists of row tuples.
+    """
+    # Imported here so the web app doesn't load pyarrow until it is needed
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    types = {"string": pa.string(), "bool": pa.bool_(), "float": pa.float64()}
+    schema = pa.schema([(name, types[kind]) for name, kind in columns])
+    with pq.ParquetWriter(path, schema) as writer:
+        for rows in chunks:
+            if rows:
+                writer.write_batch(
+                    pa.record_batch([list(values) for values in zip(*rows)], schema)
+                )
+
+
+def iter_file(path, chunk_size=64 * 1024):
+    """
+    Streams an export file in chunks. Deleting it is up to the caller, as a
+    generator that is never iterated never runs its cleanup.
+    """
+    with open(path, "rb") as f:
+        while chunk := f.read(chunk_size):
+            yield chunk
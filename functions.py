@@ -1,20 +1,117 @@
-import pandas as pd
-from openai import OpenAI
+from pydantic import BaseModel, ValidationError
+from typing import List, Literal
 import re
 import json
+import hashlib
+import functools
+import time
 import os
-import fitz
-import numpy as np
-from dotenv import load_dotenv
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor, as_completed
+from concurrent.futures.process import BrokenProcessPool
+from resilience import CircuitBreaker, CircuitOpenError, call_with_retries
+from evaluators import get_evaluator
+from metrics import observe_llm_request
 
-api_key = os.getenv("API_KEY")
-client = OpenAI(api_key=api_key)
+MODEL_NAME = os.getenv("OPENAI_MODEL", "gpt-4o-mini")
+# USD per million (prompt, cached prompt, completion) tokens, for cost reports
+MODEL_PRICES = {
+    "gpt-4o-mini": (0.15, 0.075, 0.60),
+    "gpt-4o": (2.50, 1.25, 10.00),
+    "gpt-4.1-nano": (0.10, 0.025, 0.40),
+    "gpt-4.1-mini": (0.40, 0.10, 1.60),
+    "gpt-4.1": (2.00, 0.50, 8.00),
+}
+# Bump whenever the prompt in check_requirements changes so cached evaluations
+# produced by an older prompt are no longer reused.
+PROMPT_VERSION = "3"
 
+API_MAX_RETRIES = int(os.getenv("API_MAX_RETRIES", 4))
+# Shared by all evaluation threads of the process
+api_breaker = CircuitBreaker(
+    failure_threshold=int(os.getenv("API_BREAKER_THRESHOLD", 5)),
+    reset_timeout=float(os.getenv("API_BREAKER_RESET_SECONDS", 30)),
+)
 
-def extract_text_from_pdf(file_path):
-    pdf = fitz.open(file_path)
-    final_text = [pdf[page_number].get_text() for page_number in range(len(pdf))]
-    return "\n".join(final_text)
+# Separates pages in extracted text; it is whitespace to str.split(), so it
+# disappears when preprocess_resume collapses whitespace
+PAGE_BREAK = "\f"
+
+
+def extract_text_from_pdf(pdf_data, max_pages=None, max_chars=None):
+    """
+    Extracts text from an in-memory PDF.
+
+    Args:
+        pdf_data (bytes): Raw PDF file contents.
+        max_pages (int, optional): Stop after this many pages.
+        max_chars (int, optional): Stop once this many characters are extracted.
+
+    Returns:
+        str: The extracted text with pages separated by PAGE_BREAK, truncated
+            to max_chars.
+    """
+    import fitz
+
+    with fitz.open(stream=pdf_data, filetype="pdf") as pdf:
+        page_count = len(pdf) if max_pages is None else min(len(pdf), max_pages)
+        final_text = []
+        length = 0
+        for page_number in range(page_count):
+            text = pdf[page_number].get_text()
+            final_text.append(text)
+            length += len(text)
+            if max_chars is not None and length >= max_chars:
+                break
+    return PAGE_BREAK.join(final_text)[:max_chars]
+
+
+_extraction_pool = None
+
+
+def get_extraction_pool(max_workers=None):
+    """
+    Returns the shared process pool used for PDF extraction, creating it on
+    first use. It is sized to the available cores unless max_workers is given.
+    """
+    global _extraction_pool
+    if _extraction_pool is None:
+        _extraction_pool = ProcessPoolExecutor(
+            max_workers=max_workers or os.cpu_count()
+        )
+    return _extraction_pool
+
+
+def extract_texts(pdf_blobs, max_pages=None, max_chars=None, max_workers=None):
+    """
+    Extracts text from several in-memory PDFs in parallel worker processes.
+
+    Args:
+        pdf_blobs (list): Raw PDF file contents.
+        max_pages (int, optional): Page cap applied to each document.
+        max_chars (int, optional): Character cap applied to each document.
+        max_workers (int, optional): Size of the process pool.
+
+    Returns:
+        list: One (text, error) tuple per PDF in input order; error is None on
+            success and text is None on failure.
+    """
+    global _extraction_pool
+    pool = get_extraction_pool(max_workers)
+    futures = [
+        pool.submit(extract_text_from_pdf, pdf_data, max_pages, max_chars)
+        for pdf_data in pdf_blobs
+    ]
+    results = []
+    for future in futures:
+        try:
+            results.append((future.result(), None))
+        except BrokenProcessPool as e:
+            # A crashed child poisons the pool; start a fresh one next time
+            _extraction_pool = None
+            results.append((None, e))
+        except Exception as e:
+            results.append((None, e))
+    return results
 
 
 def preprocess_resume(resume_text):
@@ -56,27 +153,257 @@ def format_qualifications(qualifications):
     return "\n".join(f"- {q}" for q in qualifications)
 
 
-def check_requirements(
-    resume_data, min_qualifications, pref_qualifications, added_value
+def evaluation_cache_key(
+    resume_data,
+    min_qualifications,
+    pref_qualifications,
+    added_value,
+    model=MODEL_NAME,
+    prompt_version=PROMPT_VERSION,
 ):
     """
-    Evaluates a resume against a list of requirements using OpenAI's API.
+    Builds a content-addressed key for an evaluation result.
 
     Args:
         resume_data (dict): Preprocessed resume data with text, name, and email.
         min_qualifications (list): List of minimum qualifications.
         pref_qualifications (list): List of preferred qualifications.
         added_value (list): List of added-value qualifications.
+        model (str): Model name used for the evaluation.
+        prompt_version (str): Version of the evaluation prompt.
 
     Returns:
-        dict: A dictionary of results for each qualification or an error message.
+        str: Hex SHA-256 digest identifying the evaluation.
+    """
+    payload = json.dumps(
+        {
+            "resume_text": " ".join(resume_data["resume_text"].split()),
+            "criteria": [
+                ["Minimum Qualification", list(min_qualifications)],
+                ["Preferred Qualification", list(pref_qualifications)],
+                ["Added Value", list(added_value)],
+            ],
+            "model": model,
+            "prompt_version": prompt_version,
+        },
+        ensure_ascii=False,
+        sort_keys=True,
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def criterion_hash(qualification):
+    """
+    Hashes a criterion's text, ignoring whitespace differences, so its stored
+    verdicts survive edits to other criteria of the position.
     """
-    prompt = f"""
-You are an expert in evaluating resumes for job qualifications. Your task is to evaluate whether the candidate meets the qualifications listed below.
+    normalized = " ".join(qualification.split())
+    return hashlib.sha256(normalized.encode("utf-8")).hexdigest()
+
+
+def verdict_resume_key(resume_hash, model=MODEL_NAME, prompt_version=PROMPT_VERSION):
+    """
+    Builds the key stored verdicts are filed under for one resume.
+
+    Args:
+        resume_hash (str): dedupe.content_hash of the text sent to the model.
+        model (str): Model name used for the evaluation.
+        prompt_version (str): Version of the evaluation prompt.
+
+    Returns:
+        str: Hex SHA-256 digest.
+    """
+    payload = f"{resume_hash}\n{model}\n{prompt_version}"
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def evaluation_profile(result):
+    """
+    Returns the part of an evaluation that doesn't depend on the criteria.
+    """
+    return {
+        key: result[key] for key in ("name", "email", "summarization", "is_veteran")
+    }
+
+
+def align_verdicts(result, qualification_lists=None):
+    """
+    Maps the model's answers onto the criteria it was asked about.
+
+    Answers are matched by criterion text; if the model reworded a criterion,
+    answers of the same tier are matched by position instead.
+
+    Args:
+        result (dict): Evaluation from check_requirements.
+        qualification_lists (tuple, optional): Minimum, preferred and
+            added-value qualifications the evaluation was asked for. Defaults
+            to the criteria as worded in the answer.
+
+    Returns:
+        dict: Mapping of criterion_hash to {"met": bool, "explanation": str}.
+    """
+    if qualification_lists is None:
+        qualification_lists = tuple(
+            tuple(
+                answer["qualification"]
+                for answer in result["qualifications"]
+                if answer["qualification_type"] == qualification_type
+            )
+            for qualification_type in QUALIFICATION_TYPES
+        )
+    by_hash = {
+        criterion_hash(answer["qualification"]): answer
+        for answer in result["qualifications"]
+    }
+    verdicts = {}
+    for qualification_type, qualifications in zip(
+        QUALIFICATION_TYPES, qualification_lists
+    ):
+        answers = [
+            answer
+            for answer in result["qualifications"]
+            if answer["qualification_type"] == qualification_type
+        ]
+        for position, qualification in enumerate(qualifications):
+            answer = by_hash.get(criterion_hash(qualification))
+            if answer is None and len(answers) == len(qualifications):
+                answer = answers[position]
+            if answer is not None:
+                verdicts[criterion_hash(qualification)] = {
+                    "met": bool(answer["true_or_false"]),
+                    "explanation": answer.get("explanation"),
+                }
+    return verdicts
+
+
+def missing_criteria(qualification_lists, verdicts):
+    """
+    Returns the minimum, preferred and added-value qualifications that have
+    no verdict in `verdicts`.
+    """
+    return tuple(
+        tuple(
+            qualification
+            for qualification in qualifications
+            if criterion_hash(qualification) not in verdicts
+        )
+        for qualifications in qualification_lists
+    )
+
+
+def merge_evaluation(profile, qualification_lists, verdicts):
+    """
+    Assembles a full evaluation from a stored profile and per-criterion
+    verdicts, in the format check_requirements returns.
+
+    Args:
+        profile (dict): Output of evaluation_profile.
+        qualification_lists (tuple): Minimum, preferred and added-value
+            qualifications of the position.
+        verdicts (dict): Mapping of criterion_hash to verdict dict.
+
+    Returns:
+        dict: The evaluation; criteria without a verdict are left out.
+    """
+    return {
+        **profile,
+        "qualifications": [
+            {
+                "qualification_type": qualification_type,
+                "qualification": qualification,
+                "true_or_false": verdicts[criterion_hash(qualification)]["met"],
+                "explanation": verdicts[criterion_hash(qualification)]["explanation"],
+            }
+            for qualification_type, qualifications in zip(
+                QUALIFICATION_TYPES, qualification_lists
+            )
+            for qualification in qualifications
+            if criterion_hash(qualification) in verdicts
+        ],
+    }
+
+
+class QualificationAssessment(BaseModel):
+    qualification_type: Literal[
+        "Minimum Qualification", "Preferred Qualification", "Added Value"
+    ]
+    qualification: str
+    true_or_false: bool
+    explanation: str
+
+
+class ResumeEvaluation(BaseModel):
+    name: str
+    email: str
+    summarization: str
+    is_veteran: bool
+    qualifications: List[QualificationAssessment]
+
+
+def strict_json_schema(schema):
+    """
+    Adapts a JSON schema to OpenAI's strict structured outputs, where every
+    object must list all its properties as required and allow no others.
+    """
+    if isinstance(schema, list):
+        return [strict_json_schema(value) for value in schema]
+    if not isinstance(schema, dict):
+        return schema
+    schema = {key: strict_json_schema(value) for key, value in schema.items()}
+    if schema.get("type") == "object":
+        schema["required"] = list(schema.get("properties", {}))
+        schema["additionalProperties"] = False
+    return schema
+
+
+@functools.cache
+def evaluation_response_format():
+    """
+    Returns the strict JSON schema the model's answer is constrained to.
+    """
+    return {
+        "type": "json_schema",
+        "json_schema": {
+            "name": ResumeEvaluation.__name__,
+            "schema": strict_json_schema(ResumeEvaluation.model_json_schema()),
+            "strict": True,
+        },
+    }
+
+
+def is_transient_api_error(error):
+    """
+    Tells whether an OpenAI error is worth retrying.
+    """
+    import openai
+
+    if isinstance(error, openai.RateLimitError):
+        # An exhausted quota won't come back by waiting
+        return getattr(error, "code", None) != "insufficient_quota"
+    return isinstance(
+        error, (openai.APIConnectionError, openai.InternalServerError)
+    ) or (isinstance(error, openai.APIStatusError) and error.status_code in (408, 409))
+
+
+def build_instructions(min_qualifications, pref_qualifications, added_value):
+    """
+    Builds the static part of the evaluation prompt for a position.
+
+    The text depends only on the position's qualifications, so it is
+    byte-identical for every resume screened against that position and forms
+    a prompt prefix the provider can cache.
+
+    Args:
+        min_qualifications (list): List of minimum qualifications.
+        pref_qualifications (list): List of preferred qualifications.
+        added_value (list): List of added-value qualifications.
+
+    Returns:
+        str: Instructions, qualifications and output schema.
+    """
+    return f"""
+You are an expert in evaluating resumes for job qualifications. Your task is to evaluate whether the candidate meets the qualifications listed below. The candidate's resume is given in the next message.
 
----
-Resume:
-{resume_data['resume_text']}
 ---
 Minimum Qualifications:
 {format_qualifications(min_qualifications)}
@@ -91,9 +418,9 @@ Added Value:
 Your response should strictly follow this JSON format:
 {{
     "name": "Find the candidate name",
-    "email": "{resume_data['email']}",
+    "email": "The email address given with the resume",
     "summarization": "A concise summary of the resume (2-3 sentences).",
-    "is_veteran": "Detect is the candidate a veteran or not based on the resume, respond with True or False only",
+    "is_veteran": "Detect is the candidate a veteran or not based on the resume, respond with true or false only",
     "qualifications": [
         {{
             "qualification_type": "Minimum Qualification",
@@ -120,33 +447,371 @@ Your response should strictly follow this JSON format:
 - Maintain a formal and professional tone.
 - Analyze and find what is the name of the candidate from this resume
 """
+
+
+def format_resume(resume_data):
+    """
+    Formats the per-candidate part of the evaluation prompt.
+
+    Args:
+        resume_data (dict): Preprocessed resume data with text, name, and email.
+
+    Returns:
+        str: The resume message.
+    """
+    return f"""Email: {resume_data['email']}
+---
+Resume:
+{resume_data['resume_text']}
+---"""
+
+
+def get_usage(response):
+    """
+    Extracts token counts from a chat completion response.
+
+    Returns:
+        dict: prompt_tokens, completion_tokens and cached_tokens.
+    """
+    usage = response.usage
+    details = getattr(usage, "prompt_tokens_details", None)
+    return {
+        "prompt_tokens": usage.prompt_tokens,
+        "completion_tokens": usage.completion_tokens,
+        "cached_tokens": getattr(details, "cached_tokens", None) or 0,
+    }
+
+
+def estimate_cost(model, prompt_tokens, completion_tokens, cached_tokens=0):
+    """
+    Estimates what calls to a model cost from their token counts.
+
+    Args:
+        model (str): Model name, a key of MODEL_PRICES.
+        prompt_tokens (int): Prompt tokens, the cached ones included.
+        completion_tokens (int): Completion tokens.
+        cached_tokens (int): Prompt tokens served from the prompt cache.
+
+    Returns:
+        float: Cost in USD, or None if the model's prices are unknown.
+    """
+    prices = MODEL_PRICES.get(model)
+    if prices is None:
+        return None
+    prompt_price, cached_price, completion_price = prices
+    return (
+        (prompt_tokens - cached_tokens) * prompt_price
+        + cached_tokens * cached_price
+        + completion_tokens * completion_price
+    ) / 1e6
+
+
+def build_chat_request(resume_data, instructions, model=MODEL_NAME):
+    """
+    Builds the chat completion request for one resume.
+
+    Args:
+        resume_data (dict): Preprocessed resume data with text, name, and email.
+        instructions (str): Output of build_instructions for the position.
+        model (str): Model to ask.
+
+    Returns:
+        dict: Keyword arguments for a chat completion, as taken by
+            Evaluator.complete.
+    """
+    return {
+        "model": model,
+        # The static instructions come first so every resume for the same
+        # position shares a cacheable prompt prefix
+        "messages": [
+            {"role": "system", "content": instructions},
+            {"role": "user", "content": format_resume(resume_data)},
+        ],
+        "temperature": 0.3,  # Reduce randomness for consistent results
+        "response_format": evaluation_response_format(),
+    }
+
+
+def parse_evaluation(response):
+    """
+    Validates the model's answer from a chat completion against
+    ResumeEvaluation.
+
+    Args:
+        response (ChatCompletion): The API response.
+
+    Returns:
+        dict: The evaluation, or an error message, with token counts under "usage".
+            Errors have "invalid" set, as the model answered but unusably.
+    """
+    usage = get_usage(response)
+    message = response.choices[0].message
+    refusal = getattr(message, "refusal", None)
+    if refusal:
+        return {
+            "error": f"The model refused to evaluate: {refusal}",
+            "invalid": True,
+            "usage": usage,
+        }
     try:
-        global response
-        response = client.chat.completions.create(
-            # model="gpt-3.5-turbo",
-            model="gpt-4o-mini",
-            # model="gpt-4o",
-            messages=[
-                {"role": "system", "content": "You are a helpful assistant."},
-                {"role": "user", "content": prompt},
-            ],
-            temperature=0.3,  # Reduce randomness for consistent results
+        evaluation = ResumeEvaluation.model_validate_json(message.content or "")
+    except ValidationError as e:
+        print("Invalid evaluation in API response:", e)
+        return {
+            "error": "Invalid evaluation format in API response.",
+            "invalid": True,
+            "usage": usage,
+        }
+    result_dict = evaluation.model_dump()
+    result_dict["usage"] = usage
+    return result_dict
+
+
+def check_requirements(
+    resume_data,
+    min_qualifications,
+    pref_qualifications,
+    added_value,
+    instructions=None,
+    model=MODEL_NAME,
+):
+    """
+    Evaluates a resume against a list of requirements with the configured
+    evaluator backend (the OpenAI API by default).
+
+    Args:
+        resume_data (dict): Preprocessed resume data with text, name, and email.
+        min_qualifications (list): List of minimum qualifications.
+        pref_qualifications (list): List of preferred qualifications.
+        added_value (list): List of added-value qualifications.
+        instructions (str, optional): Output of build_instructions for these
+            qualifications, to avoid rebuilding it for every resume.
+        model (str): Model to ask.
+
+    Transient API errors are retried with backoff. If they persist, or the
+    circuit breaker is open, the error dict has "retryable" set so the caller
+    can requeue the resume instead of failing it. Calls the open breaker
+    refused also have "circuit_open" set, since the API was never asked.
+
+    Returns:
+        dict: A dictionary of results for each qualification or an error message.
+            When the API answered, the token counts and the seconds the
+            request took are under "usage".
+    """
+    if instructions is None:
+        instructions = build_instructions(
+            min_qualifications, pref_qualifications, added_value
         )
-        result = response.choices[0].message.content
-        # Attempt to parse the JSON response
-        try:
-            # result_dict = json.loads(result)
-            result_dict = json.loads(result.replace("```json", "").replace("```", ""))
-            return result_dict
-        except json.JSONDecodeError:
-            print("Failed to parse JSON. Raw response:", result)
-            return {"error": "Invalid JSON format in API response."}
+    request = build_chat_request(resume_data, instructions, model)
+    evaluator = get_evaluator()
+    start = time.perf_counter()
+    try:
+        response = call_with_retries(
+            lambda: evaluator.complete(request),
+            is_retryable=is_transient_api_error,
+            breaker=api_breaker,
+            max_retries=API_MAX_RETRIES,
+        )
+    except CircuitOpenError as e:
+        return {"error": str(e), "retryable": True, "circuit_open": True}
     except Exception as e:
         print(f"Error communicating with OpenAI API: {e}")
-        return {"error": str(e)}
+        observe_llm_request(time.perf_counter() - start, None, "error", model)
+        return {"error": str(e), "retryable": is_transient_api_error(e)}
+
+    seconds = time.perf_counter() - start
+    result = parse_evaluation(response)
+    observe_llm_request(
+        seconds, result["usage"], "invalid" if "error" in result else "ok", model
+    )
+    result["usage"]["seconds"] = seconds
+    return result
 
 
-def get_score(results, qualification_score=None):
+def iter_evaluations(
+    resume_batch,
+    min_qualifications,
+    pref_qualifications,
+    added_value,
+    max_workers=8,
+    instructions=None,
+    model=MODEL_NAME,
+):
+    """
+    Evaluates several resumes concurrently, yielding each result as soon as it
+    is ready.
+
+    Args:
+        resume_batch (list): Preprocessed resume data dicts.
+        min_qualifications (list): List of minimum qualifications.
+        pref_qualifications (list): List of preferred qualifications.
+        added_value (list): List of added-value qualifications.
+        max_workers (int): Maximum number of concurrent OpenAI requests.
+        instructions (str, optional): Precompiled output of build_instructions.
+        model (str): Model to ask.
+
+    Yields:
+        tuple: (index into resume_batch, result dict), in completion order.
+    """
+    if not resume_batch:
+        return
+
+    if instructions is None:
+        instructions = build_instructions(
+            min_qualifications, pref_qualifications, added_value
+        )
+    max_workers = max(1, min(max_workers, len(resume_batch)))
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = {
+            executor.submit(
+                check_requirements,
+                resume_data=resume_data,
+                min_qualifications=min_qualifications,
+                pref_qualifications=pref_qualifications,
+                added_value=added_value,
+                instructions=instructions,
+                model=model,
+            ): index
+            for index, resume_data in enumerate(resume_batch)
+        }
+        for future in as_completed(futures):
+            yield futures[future], future.result()
+
+
+def score_share(result, qualification_score):
+    """
+    Returns the share of the highest possible tier score an evaluation
+    reached, the veteran bonus left out.
+
+    Args:
+        result (dict): Evaluation from check_requirements.
+        qualification_score (dict): Weight of each qualification type.
+
+    Returns:
+        float: Between 0 and 1; 0 when no criterion has a weight.
+    """
+    earned = possible = 0
+    for qualification in result["qualifications"]:
+        weight = qualification_score[qualification["qualification_type"]]
+        possible += weight
+        if qualification["true_or_false"]:
+            earned += weight
+    return earned / possible if possible else 0.0
+
+
+def needs_escalation(result, qualification_score, cutoff, band):
+    """
+    Decides whether a cheap model's evaluation should be redone by the
+    stronger model of a cascade: when its answer was unusable, or its score
+    is too close to the shortlist cut-off to trust.
+
+    Args:
+        result (dict): Evaluation from check_requirements.
+        qualification_score (dict): Weight of each qualification type.
+        cutoff (float): Shortlist cut-off, as a share of the highest
+            possible score.
+        band (float): How far from the cut-off a score still counts as
+            borderline, in the same unit.
+
+    Returns:
+        bool: True if the evaluation should be escalated.
+    """
+    if "error" in result:
+        # API failures are retried as they are; only bad answers escalate
+        return result.get("invalid", False)
+    return abs(score_share(result, qualification_score) - cutoff) <= band
+
+
+QUALIFICATION_TYPES = [
+    "Minimum Qualification",
+    "Preferred Qualification",
+    "Added Value",
+]
+
+# Share of a veteran's qualification total added as the veteran score
+VETERAN_BONUS = 0.05
+
+
+def score_verdicts(
+    candidate_ids,
+    tier_ids,
+    met,
+    is_veteran,
+    qualification_score,
+    veteran_bonus=VETERAN_BONUS,
+):
+    """
+    Scores many candidates from their criterion verdicts in one pass.
+
+    The verdicts are given as parallel arrays, one entry per verdict, so a
+    whole run can be re-scored with new weights without re-reading the
+    evaluations.
+
+    Args:
+        candidate_ids (np.ndarray): Index of the verdict's candidate, 0 to n-1.
+        tier_ids (np.ndarray): Index of the verdict's tier in
+            QUALIFICATION_TYPES, or -1 for an unknown tier.
+        met (np.ndarray): Whether the candidate meets the criterion, or the
+            number of criteria met when the verdicts are counted per tier.
+        is_veteran (np.ndarray): Veteran flag of each candidate, length n.
+        qualification_score (dict): Score per qualification tier.
+        veteran_bonus (float): Share of the total added for veterans.
+
+    Returns:
+        tuple: (tier totals of shape (n, 3), NaN where the candidate has no
+            verdict in that tier; veteran scores; final scores).
+    """
+    import numpy as np
+
+    n = len(is_veteran)
+    candidate_ids = np.asarray(candidate_ids, dtype=np.int64)
+    tier_ids = np.asarray(tier_ids, dtype=np.int64)
+    met = np.asarray(met, dtype=float)
+    weights = np.array(
+        [qualification_score[tier] for tier in QUALIFICATION_TYPES], dtype=float
+    )
+
+    known = tier_ids >= 0
+    # Flat index of each verdict's (candidate, tier) cell
+    cells = candidate_ids[known] * len(QUALIFICATION_TYPES) + tier_ids[known]
+    size = n * len(QUALIFICATION_TYPES)
+    met_counts = np.bincount(cells, weights=met[known], minlength=size)
+    present = np.bincount(cells, minlength=size) > 0
+
+    shape = (n, len(QUALIFICATION_TYPES))
+    totals = met_counts.reshape(shape) * weights
+    totals[~present.reshape(shape)] = np.nan
+    qualification_totals = np.nansum(totals, axis=1)
+    veteran_scores = np.where(
+        np.asarray(is_veteran, dtype=bool),
+        np.round(qualification_totals * veteran_bonus, 2),
+        0,
+    )
+    return totals, veteran_scores, qualification_totals + veteran_scores
+
+
+def score_batch(
+    results_list, qualification_score=None, file_names=None, veteran_bonus=None
+):
+    """
+    Scores a whole run of evaluations at once with array operations.
+
+    Every row has the candidate's details, a score per qualification, the
+    tier totals, the veteran score, the final score and the "File Name".
+
+    Args:
+        results_list (list): Evaluation result dicts from check_requirements.
+        qualification_score (dict, optional): Score per qualification tier.
+        file_names (list, optional): File name for each result.
+        veteran_bonus (float, optional): Share of the total added for
+            veterans, VETERAN_BONUS by default.
+
+    Returns:
+        pd.DataFrame: One row per candidate, indexed by "Candidate Name".
+    """
+    # Imported here so starting the web app doesn't load pandas and numpy
+    import numpy as np
+    import pandas as pd
 
     if qualification_score is None:
         qualification_score = {
@@ -154,54 +819,82 @@ def get_score(results, qualification_score=None):
             "Preferred Qualification": 2,
             "Added Value": 3,
         }
+    if veteran_bonus is None:
+        veteran_bonus = VETERAN_BONUS
 
-    df = pd.DataFrame(results["qualifications"])
-    df["score"] = df.apply(
-        lambda row: (
-            qualification_score[row["qualification_type"]]
-            if row["true_or_false"]
-            else 0
-        ),
-        axis=1,
-    )
-    scores = df[["qualification", "score"]].set_index("qualification")
-
-    score_summary = (
-        df.groupby("qualification_type")
-        .sum()["score"]
-        .to_frame()
-        .reindex(["Minimum Qualification", "Preferred Qualification", "Added Value"])
-        .reset_index()
+    n = len(results_list)
+    tier_index = {tier: i for i, tier in enumerate(QUALIFICATION_TYPES)}
+
+    # Flatten every candidate's qualifications into parallel arrays
+    column_index = {}
+    candidate_ids, column_ids, tier_ids, weights, met = [], [], [], [], []
+    for candidate_id, results in enumerate(results_list):
+        for qualification in results["qualifications"]:
+            qualification_type = qualification["qualification_type"]
+            column_ids.append(
+                column_index.setdefault(
+                    qualification["qualification"], len(column_index)
+                )
+            )
+            candidate_ids.append(candidate_id)
+            tier_ids.append(tier_index.get(qualification_type, -1))
+            weights.append(qualification_score[qualification_type])
+            met.append(bool(qualification["true_or_false"]))
+
+    candidate_ids = np.asarray(candidate_ids, dtype=np.int64)
+    column_ids = np.asarray(column_ids, dtype=np.int64)
+    tier_ids = np.asarray(tier_ids, dtype=np.int64)
+    qualification_scores = np.where(met, weights, 0).astype(np.int64)
+
+    scores = np.full((n, len(column_index)), np.nan)
+    scores[candidate_ids, column_ids] = qualification_scores
+
+    veteran = np.array(
+        [bool(results["is_veteran"]) for results in results_list], dtype=bool
     )
-    score_summary["qualification_type"] = score_summary["qualification_type"].apply(
-        lambda col: f"{col} Total Score"
+    totals, veteran_scores, final_scores = score_verdicts(
+        candidate_ids, tier_ids, met, veteran, qualification_score, veteran_bonus
     )
-    score_summary = score_summary.set_index("qualification_type")
 
-    candidate_info = pd.DataFrame(
-        data={
-            "Candidate Name": [results["name"]],
-            "Email": results["email"],
-            "Veteran": [results["is_veteran"]],
-        }
-    )
+    # A candidate missing a whole tier gets NaN totals, which makes every score
+    # column float for that candidate, exactly as per-candidate frames would
+    all_int = not bool(np.isnan(totals).any())
+
+    def as_column(values, is_int):
+        if is_int and not np.isnan(values).any():
+            return values.astype(np.int64)
+        return values
 
-    scores = pd.concat([scores, score_summary]).T.reset_index(drop=True)
-    scores = pd.concat([candidate_info, scores], axis=1)
-    scores["Veteran Score"] = scores.apply(
-        lambda row: (
-            np.round(score_summary.sum()["score"] * 0.05, 2) if row["Veteran"] else 0
+    columns = {
+        "Email": [results["email"] for results in results_list],
+        "Veteran": pd.Series(
+            [results["is_veteran"] for results in results_list]
+        ).to_numpy(),
+    }
+    for qualification, column_id in column_index.items():
+        columns[qualification] = as_column(scores[:, column_id], all_int)
+    for tier_id, tier in enumerate(QUALIFICATION_TYPES):
+        columns[f"{tier} Total Score"] = as_column(totals[:, tier_id], all_int)
+    columns["Veteran Score"] = as_column(veteran_scores, not veteran.any())
+    columns["Final Score"] = as_column(final_scores, all_int and not veteran.any())
+    columns["Summary"] = [results["summarization"] for results in results_list]
+    if file_names is not None:
+        columns["File Name"] = list(file_names)
+
+    # Columns first seen on a later candidate go after the first candidate's
+    # columns, matching how pd.concat unions the per-candidate frames
+    first_columns = {
+        qualification["qualification"]: None
+        for qualification in (results_list[0]["qualifications"] if n else [])
+    }
+    tail = list(columns)[2 + len(column_index) :]
+    order = ["Email", "Veteran", *first_columns, *tail]
+    order += [column for column in columns if column not in order]
+
+    final_result = pd.DataFrame(
+        {column: columns[column] for column in order},
+        index=pd.Index(
+            [results["name"] for results in results_list], name="Candidate Name"
         ),
-        axis=1,
     )
-    scores["Final Score"] = scores[
-        [
-            "Minimum Qualification Total Score",
-            "Preferred Qualification Total Score",
-            "Added Value Total Score",
-            "Veteran Score",
-        ]
-    ].sum(axis=1)
-    scores["Summary"] = results["summarization"]
-    scores = scores.set_index("Candidate Name")
-    return scores
+    return final_result
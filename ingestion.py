@@ -0,0 +1,78 @@
+import os
+import zipfile
+from werkzeug.utils import secure_filename
+
+# Members larger than this are skipped rather than read, so a malicious
+# archive can't exhaust memory when decompressed
+MAX_ZIP_MEMBER_BYTES = 20 * 1024 * 1024
+
+
+def is_pdf_name(filename):
+    return filename.lower().endswith(".pdf")
+
+
+def iter_zip_pdfs(archive_file, archive_name, max_member_bytes=MAX_ZIP_MEMBER_BYTES):
+    """
+    Reads the PDFs inside a ZIP archive one member at a time.
+
+    Folders are walked recursively; their path becomes part of the file name
+    so resumes with the same name in different folders stay distinct.
+
+    Args:
+        archive_file: Seekable file object holding the archive.
+        archive_name (str): Name of the uploaded archive, for error messages.
+        max_member_bytes (int): Skip members that decompress to more than this.
+
+    Yields:
+        tuple: (file_name, pdf_data, None) for each PDF, or
+            (file_name, None, reason) for each skipped member.
+    """
+    try:
+        archive = zipfile.ZipFile(archive_file)
+    except zipfile.BadZipFile:
+        yield archive_name, None, "not a valid ZIP archive"
+        return
+
+    with archive:
+        for info in archive.infolist():
+            name = info.filename
+            base_name = os.path.basename(name.rstrip("/"))
+            if info.is_dir() or name.startswith("__MACOSX/"):
+                continue
+            if base_name.startswith("."):
+                continue
+            file_name = secure_filename(name) or "resume.pdf"
+            if not is_pdf_name(name):
+                yield file_name, None, "not a PDF"
+            elif info.file_size > max_member_bytes:
+                yield file_name, None, "larger than the size limit"
+            else:
+                try:
+                    with archive.open(info) as member:
+                        yield file_name, member.read(), None
+                except (zipfile.BadZipFile, RuntimeError, NotImplementedError) as e:
+                    # Corrupt, encrypted or unsupported compression
+                    yield file_name, None, f"could not be unpacked ({e})"
+
+
+def iter_uploaded_pdfs(files, max_member_bytes=MAX_ZIP_MEMBER_BYTES):
+    """
+    Yields the PDFs of an upload, expanding ZIP archives as it goes.
+
+    Args:
+        files (list): Uploaded FileStorage objects.
+        max_member_bytes (int): Size limit for PDFs inside archives.
+
+    Yields:
+        tuple: (file_name, pdf_data, None) for each PDF, or
+            (file_name, None, reason) for each skipped file.
+    """
+    for file in files:
+        if not file or not file.filename:
+            continue
+        if file.filename.lower().endswith(".zip"):
+            yield from iter_zip_pdfs(file.stream, file.filename, max_member_bytes)
+        elif is_pdf_name(file.filename):
+            yield secure_filename(file.filename), file.read(), None
+        else:
+            yield secure_filename(file.filename), None, "not a PDF or ZIP file"
@@ -0,0 +1,188 @@
+import os
+import time
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    REGISTRY,
+    CollectorRegistry,
+    Counter,
+    Histogram,
+    generate_latest,
+    multiprocess,
+)
+
+# Pipeline stages, in the order a resume goes through them
+STAGES = ["upload", "extract", "preprocess", "evaluate", "score", "export"]
+
+# Stage calls range from milliseconds (scoring a few results) to minutes
+# (exporting a large run)
+STAGE_BUCKETS = (
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1,
+    2.5,
+    5,
+    10,
+    30,
+    60,
+    120,
+    300,
+)
+
+STAGE_SECONDS = Histogram(
+    "screener_stage_seconds",
+    "Time spent in one call of a pipeline stage.",
+    ["stage"],
+    buckets=STAGE_BUCKETS,
+)
+STAGE_ITEMS = Counter(
+    "screener_stage_items",
+    "Resumes processed by each pipeline stage.",
+    ["stage"],
+)
+LLM_REQUEST_SECONDS = Histogram(
+    "screener_llm_request_seconds",
+    "Latency of one evaluation request, retries included.",
+    ["outcome", "model"],
+    buckets=STAGE_BUCKETS,
+)
+LLM_TOKENS = Counter(
+    "screener_llm_tokens",
+    "Tokens used by evaluation requests.",
+    ["kind", "model"],
+)
+EVALUATION_CACHE_LOOKUPS = Counter(
+    "screener_evaluation_cache_lookups",
+    "Resumes looked up in the evaluation cache, by whether they were found.",
+    ["result"],
+)
+
+
+def observe_stage(stage, seconds, items=0):
+    """
+    Records one call of a pipeline stage.
+
+    Args:
+        stage (str): One of STAGES.
+        seconds (float): Time the call took.
+        items (int): Resumes it processed.
+    """
+    STAGE_SECONDS.labels(stage).observe(seconds)
+    if items:
+        STAGE_ITEMS.labels(stage).inc(items)
+
+
+class StageTimer:
+    """
+    Times a block of code as one call of a pipeline stage.
+
+    Usage:
+        with StageTimer("extract", items=len(blobs)) as timer:
+            ...
+        timer.seconds  # available after the block
+    """
+
+    def __init__(self, stage, items=0):
+        self.stage = stage
+        self.items = items
+        self.seconds = 0.0
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.seconds = time.perf_counter() - self.start
+        observe_stage(self.stage, self.seconds, self.items)
+
+
+def iter_timed(stage, chunks, on_finish=None):
+    """
+    Passes through a generator, timing only the work done to produce its
+    chunks, not the time the consumer (e.g. a slow client) takes.
+
+    Args:
+        stage (str): Stage name.
+        chunks (iterable): The generator to time.
+        on_finish (callable, optional): Called with the total seconds once
+            the generator is exhausted.
+    """
+    seconds = 0.0
+    iterator = iter(chunks)
+    while True:
+        start = time.perf_counter()
+        try:
+            chunk = next(iterator)
+        except StopIteration:
+            break
+        finally:
+            seconds += time.perf_counter() - start
+        yield chunk
+    observe_stage(stage, seconds)
+    if on_finish is not None:
+        on_finish(seconds)
+
+
+def observe_llm_request(seconds, usage, outcome, model):
+    """
+    Records one evaluation request.
+
+    Args:
+        seconds (float): Time taken, retries included.
+        usage (dict): Token counts from functions.get_usage, or None.
+        outcome (str): "ok", "invalid" (an unusable answer) or "error".
+        model (str): Model the request was sent to, so the stages of a
+            model cascade can be told apart.
+    """
+    LLM_REQUEST_SECONDS.labels(outcome, model).observe(seconds)
+    count_llm_tokens(usage, model)
+
+
+def count_llm_tokens(usage, model):
+    """
+    Adds the prompt, completion and cached token counts of a response.
+
+    Args:
+        usage (dict): Token counts from functions.get_usage, or None.
+        model (str): Model that answered.
+    """
+    for kind, count in (usage or {}).items():
+        LLM_TOKENS.labels(kind.removesuffix("_tokens"), model).inc(count)
+
+
+def count_cache_lookups(hits, misses):
+    """
+    Records a lookup of several resumes in the evaluation cache.
+
+    Args:
+        hits (int): Resumes with a cached evaluation.
+        misses (int): Resumes without one.
+    """
+    if hits:
+        EVALUATION_CACHE_LOOKUPS.labels("hit").inc(hits)
+    if misses:
+        EVALUATION_CACHE_LOOKUPS.labels("miss").inc(misses)
+
+
+def render_metrics():
+    """
+    Renders all metrics in the Prometheus text format.
+
+    The web app and the workers are separate processes. When
+    PROMETHEUS_MULTIPROC_DIR is set (to the same, empty directory for every
+    process), the metrics of all of them are merged; otherwise only this
+    process's metrics are reported.
+
+    Returns:
+        tuple: (body bytes, content type).
+    """
+    if os.getenv("PROMETHEUS_MULTIPROC_DIR"):
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = REGISTRY
+    return generate_latest(registry), CONTENT_TYPE_LATEST
@@ -0,0 +1,117 @@
+import re
+import numpy as np
+from collections import Counter
+
+STOP_WORDS = {
+    "a", "an", "and", "are", "as", "at", "be", "by", "for", "from", "has",
+    "have", "in", "is", "it", "of", "on", "or", "that", "the", "to", "with",
+    "experience", "ability", "knowledge", "strong", "e", "g", "etc",
+}  # fmt: skip
+
+
+def tokenize(text):
+    """
+    Splits text into lowercase word tokens, dropping stop words.
+
+    Args:
+        text (str): Text to tokenize.
+
+    Returns:
+        list: Tokens in document order.
+    """
+    return [
+        token
+        for token in re.findall(r"[a-z0-9][a-z0-9+#.]*", text.lower())
+        if token not in STOP_WORDS
+    ]
+
+
+class BM25Index:
+    """
+    Okapi BM25 index over a small in-memory corpus of resumes.
+    """
+
+    def __init__(self, documents, k1=1.5, b=0.75):
+        self.k1 = k1
+        self.b = b
+        self.term_counts = [Counter(tokenize(document)) for document in documents]
+        self.lengths = np.array(
+            [sum(counts.values()) for counts in self.term_counts], dtype=float
+        )
+        self.average_length = self.lengths.mean() if len(self.lengths) else 0.0
+
+    def score(self, query):
+        """
+        Scores every document against a query.
+
+        Args:
+            query (str): Free-text query.
+
+        Returns:
+            np.ndarray: BM25 score per document.
+        """
+        terms = list(dict.fromkeys(tokenize(query)))
+        scores = np.zeros(len(self.term_counts))
+        if not terms or not len(self.term_counts):
+            return scores
+
+        tf = np.array(
+            [[counts.get(term, 0) for term in terms] for counts in self.term_counts],
+            dtype=float,
+        )
+        document_frequency = (tf > 0).sum(axis=0)
+        n = len(self.term_counts)
+        idf = np.log(1 + (n - document_frequency + 0.5) / (document_frequency + 0.5))
+
+        norm = self.k1 * (
+            1 - self.b + self.b * self.lengths / max(self.average_length, 1.0)
+        )
+        weighted_tf = tf * (self.k1 + 1) / (tf + norm[:, None])
+        return weighted_tf @ idf
+
+
+def rank_resumes(resume_texts, criteria):
+    """
+    Ranks resumes against a position's criteria.
+
+    Each criterion is scored as its own query, so one long qualification
+    cannot drown out the others, and weighted by its tier score.
+
+    Args:
+        resume_texts (list): Extracted resume texts.
+        criteria (list): (description, weight) pairs.
+
+    Returns:
+        np.ndarray: Relevance per resume, scaled so the best resume scores 1.0.
+    """
+    index = BM25Index(resume_texts)
+    scores = np.zeros(len(resume_texts))
+    for description, weight in criteria:
+        scores += weight * index.score(description)
+    if scores.max(initial=0) > 0:
+        scores /= scores.max()
+    return scores
+
+
+def shortlist(scores, top_k=None, min_score=None):
+    """
+    Selects the resumes that should go on to the LLM evaluation.
+
+    Args:
+        scores (np.ndarray): Relevance per resume from rank_resumes.
+        top_k (int, optional): Keep at most this many of the best resumes.
+        min_score (float, optional): Keep only resumes scoring at least this.
+
+    Returns:
+        np.ndarray: Boolean mask of shortlisted resumes.
+    """
+    keep = np.ones(len(scores), dtype=bool)
+    if min_score is not None:
+        keep &= scores >= min_score
+    if top_k is not None and top_k < len(scores):
+        # Stable sort keeps upload order among tied scores
+        best = np.argsort(-scores, kind="stable")[:top_k]
+        top = np.zeros(len(scores), dtype=bool)
+        top[best] = True
+        keep &= top
+    return keep
@@ -0,0 +1,158 @@
+import time
+import random
+import threading
+from email.utils import parsedate_to_datetime
+from datetime import datetime, timezone
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling a dependency that keeps failing."""
+
+
+class CircuitBreaker:
+    """
+    Stops calling a dependency after `failure_threshold` consecutive failures.
+
+    While open, calls fail immediately. After `reset_timeout` seconds one
+    trial call is let through; its success closes the circuit again and its
+    failure re-opens it. Safe to share between threads.
+    """
+
+    def __init__(self, failure_threshold=5, reset_timeout=30.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened_at = None
+        self.trial_running = False
+        self.lock = threading.Lock()
+
+    @property
+    def is_open(self):
+        with self.lock:
+            return (
+                self.opened_at is not None
+                and time.monotonic() - self.opened_at < self.reset_timeout
+            )
+
+    def before_call(self):
+        with self.lock:
+            if self.opened_at is None:
+                return
+            if time.monotonic() - self.opened_at < self.reset_timeout:
+                raise CircuitOpenError("Circuit open after repeated API failures.")
+            if self.trial_running:
+                raise CircuitOpenError("Circuit half-open; a trial call is running.")
+            self.trial_running = True
+
+    def record_success(self):
+        with self.lock:
+            self.failures = 0
+            self.opened_at = None
+            self.trial_running = False
+
+    def record_failure(self):
+        with self.lock:
+            self.failures += 1
+            if self.trial_running or self.failures >= self.failure_threshold:
+                self.opened_at = time.monotonic()
+            self.trial_running = False
+
+
+def retry_after_seconds(error):
+    """
+    Reads the delay a server asked for from an HTTP error's headers.
+
+    Args:
+        error (Exception): Error raised by the API client.
+
+    Returns:
+        float: Seconds to wait, or None if the server didn't say.
+    """
+    response = getattr(error, "response", None)
+    if response is None:
+        return None
+    headers = response.headers
+    if headers.get("retry-after-ms"):
+        try:
+            return float(headers["retry-after-ms"]) / 1000
+        except ValueError:
+            pass
+    value = headers.get("retry-after")
+    if not value:
+        return None
+    try:
+        return float(value)
+    except ValueError:
+        pass
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    return max(0.0, (retry_at - datetime.now(timezone.utc)).total_seconds())
+
+
+def backoff_delay(attempt, base=1.0, cap=30.0):
+    """
+    Exponential backoff with full jitter, so clients that failed together
+    don't retry together.
+    """
+    return random.uniform(0, min(cap, base * 2**attempt))
+
+
+def call_with_retries(
+    call,
+    is_retryable,
+    breaker=None,
+    max_retries=4,
+    base_delay=1.0,
+    max_delay=30.0,
+    max_retry_after=120.0,
+    sleep=time.sleep,
+):
+    """
+    Calls `call`, retrying transient failures.
+
+    The wait before each retry is the server's Retry-After when it sent one,
+    otherwise a jittered exponential backoff.
+
+    Args:
+        call (callable): Function taking no arguments.
+        is_retryable (callable): Returns True for exceptions worth retrying.
+        breaker (CircuitBreaker, optional): Breaker guarding the dependency.
+        max_retries (int): Retries after the first attempt.
+        base_delay (float): Backoff before the first retry, in seconds.
+        max_delay (float): Upper bound of the backoff, in seconds.
+        max_retry_after (float): Upper bound of a server-requested wait.
+        sleep (callable): Used to wait; replaceable in tests.
+
+    Returns:
+        The return value of `call`.
+
+    Raises:
+        CircuitOpenError: If the breaker is open.
+        Exception: The last error, once retries are exhausted or the error
+            is not retryable.
+    """
+    for attempt in range(max_retries + 1):
+        if breaker is not None:
+            breaker.before_call()
+        try:
+            result = call()
+        except Exception as e:
+            retryable = is_retryable(e)
+            if breaker is not None:
+                # A rejected request still means the dependency is up
+                if retryable:
+                    breaker.record_failure()
+                else:
+                    breaker.record_success()
+            if not retryable or attempt == max_retries:
+                raise
+            delay = retry_after_seconds(e)
+            if delay is None:
+                delay = backoff_delay(attempt, base_delay, max_delay)
+            sleep(min(delay, max_retry_after))
+        else:
+            if breaker is not None:
+                breaker.record_success()
+            return result
@@ -0,0 +1,156 @@
+import re
+from markupsafe import Markup, escape
+from sqlalchemy import text
+
+# One row per candidate result, under the same rowid. Column order matters:
+# the rank weights below and highlight() refer to columns by position.
+SEARCH_TABLE_DDL = """
+CREATE VIRTUAL TABLE IF NOT EXISTS resume_search USING fts5(
+    candidate_name,
+    summary,
+    resume_text,
+    tokenize = 'porter unicode61 remove_diacritics 2'
+)
+"""
+
+# A match in the name counts most, then in the AI's summary, then in the
+# resume itself
+RANK_FUNCTION = "bm25(10.0, 4.0, 1.0)"
+
+# Control characters can't occur in the indexed text, so they mark the
+# highlights until the snippet is HTML-escaped
+HIGHLIGHT_START = "\x02"
+HIGHLIGHT_END = "\x03"
+SNIPPET_TOKENS = 24
+
+
+def create_search_table(connection):
+    """
+    Creates the full-text index if it doesn't exist yet.
+
+    Args:
+        connection: SQLAlchemy session or connection.
+    """
+    connection.execute(text(SEARCH_TABLE_DDL))
+    # Stored in the index, so "ORDER BY rank" uses the weights above
+    connection.execute(
+        text("INSERT INTO resume_search (resume_search, rank) VALUES ('rank', :rank)"),
+        {"rank": RANK_FUNCTION},
+    )
+
+
+def index_candidates(connection, rows):
+    """
+    Adds candidates to the full-text index, replacing any earlier entry
+    under the same ID.
+
+    Args:
+        connection: SQLAlchemy session or connection.
+        rows (list): Dicts with "id", "candidate_name", "summary" and
+            "resume_text" (the cleaned text from preprocess_resume).
+    """
+    if not rows:
+        return
+    connection.execute(
+        text("DELETE FROM resume_search WHERE rowid = :id"),
+        [{"id": row["id"]} for row in rows],
+    )
+    connection.execute(
+        text(
+            "INSERT INTO resume_search (rowid, candidate_name, summary, resume_text)"
+            " VALUES (:id, :candidate_name, :summary, :resume_text)"
+        ),
+        rows,
+    )
+
+
+def match_query(query):
+    """
+    Turns what a user typed into an FTS5 query.
+
+    Every word and "quoted phrase" must match; a word ending in * matches
+    any word starting with it. Everything else is ignored, so the query
+    can't be an FTS5 syntax error.
+
+    Args:
+        query (str): The search box input.
+
+    Returns:
+        str: The FTS5 query, or None if there is nothing to search for.
+    """
+    terms = []
+    for phrase, word, prefix in re.findall(r'"([^"]*)"|(\w+)(\*?)', query):
+        if phrase:
+            words = re.findall(r"\w+", phrase)
+            if words:
+                terms.append('"' + " ".join(words) + '"')
+        elif word:
+            terms.append(f'"{word}"{prefix}')
+    return " ".join(terms) or None
+
+
+def render_highlights(value):
+    """
+    HTML-escapes indexed text and turns the highlight markers into <mark>.
+
+    Returns:
+        Markup: Safe to render in a template.
+    """
+    return Markup(
+        str(escape(value or ""))
+        .replace(HIGHLIGHT_START, "<mark>")
+        .replace(HIGHLIGHT_END, "</mark>")
+    )
+
+
+def search_resumes(connection, query, limit, offset=0):
+    """
+    Finds candidates whose name, summary or resume matches the query, best
+    matches first.
+
+    Args:
+        connection: SQLAlchemy session or connection.
+        query (str): The search box input, see match_query.
+        limit (int): Maximum number of hits to return.
+        offset (int): Number of hits to skip, for paging.
+
+    Returns:
+        tuple: (total number of matches, list of hits). Each hit is a dict
+            with the candidate result "id", its "score" (higher is better),
+            and the highlighted "candidate_name" and "snippet" as Markup.
+    """
+    match = match_query(query)
+    if match is None:
+        return 0, []
+    total = connection.execute(
+        text("SELECT count(*) FROM resume_search WHERE resume_search MATCH :match"),
+        {"match": match},
+    ).scalar()
+    rows = connection.execute(
+        text(
+            "SELECT rowid, rank,"
+            " highlight(resume_search, 0, :start, :end),"
+            # -1 lets FTS5 pick the column with the best matching fragment
+            " snippet(resume_search, -1, :start, :end, '…', :tokens)"
+            " FROM resume_search WHERE resume_search MATCH :match"
+            " ORDER BY rank LIMIT :limit OFFSET :offset"
+        ),
+        {
+            "match": match,
+            "start": HIGHLIGHT_START,
+            "end": HIGHLIGHT_END,
+            "tokens": SNIPPET_TOKENS,
+            "limit": limit,
+            "offset": offset,
+        },
+    ).all()
+    return total, [
+        {
+            "id": rowid,
+            # bm25 scores are negative, more negative for better matches
+            "score": -rank,
+            "candidate_name": render_highlights(name),
+            "snippet": render_highlights(snippet),
+        }
+        for rowid, rank, name, snippet in rows
+    ]
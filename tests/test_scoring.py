@@ -0,0 +1,158 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from functions import VETERAN_BONUS, score_batch
+
+
+def get_score(results, qualification_score=None, veteran_bonus=None):
+    """
+    The per-candidate scoring score_batch replaced, kept as the reference
+    its output must match.
+    """
+    if qualification_score is None:
+        qualification_score = {
+            "Minimum Qualification": 1,
+            "Preferred Qualification": 2,
+            "Added Value": 3,
+        }
+
+    if veteran_bonus is None:
+        veteran_bonus = VETERAN_BONUS
+
+    df = pd.DataFrame(results["qualifications"])
+    df["score"] = df.apply(
+        lambda row: (
+            qualification_score[row["qualification_type"]]
+            if row["true_or_false"]
+            else 0
+        ),
+        axis=1,
+    )
+    scores = df[["qualification", "score"]].set_index("qualification")
+
+    score_summary = (
+        df.groupby("qualification_type")
+        .sum()["score"]
+        .to_frame()
+        .reindex(["Minimum Qualification", "Preferred Qualification", "Added Value"])
+        .reset_index()
+    )
+    score_summary["qualification_type"] = score_summary["qualification_type"].apply(
+        lambda col: f"{col} Total Score"
+    )
+    score_summary = score_summary.set_index("qualification_type")
+
+    candidate_info = pd.DataFrame(
+        data={
+            "Candidate Name": [results["name"]],
+            "Email": results["email"],
+            "Veteran": [results["is_veteran"]],
+        }
+    )
+
+    scores = pd.concat([scores, score_summary]).T.reset_index(drop=True)
+    scores = pd.concat([candidate_info, scores], axis=1)
+    scores["Veteran Score"] = scores.apply(
+        lambda row: (
+            np.round(score_summary.sum()["score"] * veteran_bonus, 2)
+            if row["Veteran"]
+            else 0
+        ),
+        axis=1,
+    )
+    scores["Final Score"] = scores[
+        [
+            "Minimum Qualification Total Score",
+            "Preferred Qualification Total Score",
+            "Added Value Total Score",
+            "Veteran Score",
+        ]
+    ].sum(axis=1)
+    scores["Summary"] = results["summarization"]
+    scores = scores.set_index("Candidate Name")
+    return scores
+
+
+def make_results(name, verdicts, is_veteran=False):
+    return {
+        "name": name,
+        "email": f"{name.lower()}@example.com",
+        "is_veteran": is_veteran,
+        "summarization": f"Summary of {name}.",
+        "qualifications": [
+            {
+                "qualification_type": qualification_type,
+                "qualification": qualification,
+                "true_or_false": met,
+                "explanation": "",
+            }
+            for qualification_type, qualification, met in verdicts
+        ],
+    }
+
+
+FULL = [
+    ("Minimum Qualification", "Bachelor's degree", True),
+    ("Minimum Qualification", "Teaching license", False),
+    ("Preferred Qualification", "Master's degree", True),
+    ("Added Value", "Speaks Spanish", True),
+]
+# No added-value criterion was answered, so that tier total is missing
+NO_ADDED_VALUE = [
+    ("Minimum Qualification", "Bachelor's degree", False),
+    ("Minimum Qualification", "Teaching license", True),
+    ("Preferred Qualification", "Master's degree", False),
+]
+# Answers a criterion the others weren't asked about
+EXTRA_CRITERION = [
+    ("Minimum Qualification", "Bachelor's degree", True),
+    ("Preferred Qualification", "Master's degree", True),
+    ("Preferred Qualification", "Five years of experience", True),
+    ("Added Value", "Speaks Spanish", False),
+]
+
+
+@pytest.mark.parametrize(
+    "results_list",
+    [
+        [make_results("Ann", FULL)],
+        [make_results("Ann", FULL, is_veteran=True)],
+        [make_results("Ann", FULL), make_results("Bob", NO_ADDED_VALUE)],
+        [
+            make_results("Ann", FULL, is_veteran=True),
+            make_results("Bob", NO_ADDED_VALUE),
+            make_results("Cal", EXTRA_CRITERION, is_veteran=True),
+        ],
+        [make_results("Bob", NO_ADDED_VALUE), make_results("Cal", EXTRA_CRITERION)],
+    ],
+)
+@pytest.mark.parametrize(
+    "qualification_score, veteran_bonus",
+    [
+        (None, None),
+        (
+            {
+                "Minimum Qualification": 5,
+                "Preferred Qualification": 3,
+                "Added Value": 1,
+            },
+            0.1,
+        ),
+    ],
+)
+def test_score_batch_matches_per_candidate_scores(
+    results_list, qualification_score, veteran_bonus
+):
+    expected = pd.concat(
+        [
+            get_score(results, qualification_score, veteran_bonus)
+            for results in results_list
+        ]
+    )
+    scores = score_batch(
+        results_list,
+        qualification_score=qualification_score,
+        veteran_bonus=veteran_bonus,
+    )
+    pd.testing.assert_frame_equal(scores, expected)
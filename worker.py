@@ -0,0 +1,1026 @@
+import os
+import json
+import time
+import uuid
+import traceback
+from datetime import datetime, timedelta
+from app import (
+    app,
+    db,
+    ScreeningJob,
+    ScreeningJobItem,
+    get_position_spec,
+    get_cached_evaluations,
+    store_evaluations,
+    evict_evaluation_cache,
+    get_stored_verdicts,
+    store_verdicts,
+    save_candidate_results,
+    record_stage_time,
+)
+from metrics import StageTimer, observe_stage
+import numpy as np
+from prefilter import rank_resumes, shortlist
+from dedupe import DuplicateDetector, content_hash, normalize_email
+from compaction import compact_resume, count_tokens
+from batch_mode import get_batch_client, write_batch_file, submit_batch
+from batch_mode import read_batch_results
+from functions import (
+    MODEL_NAME,
+    preprocess_resume,
+    evaluation_cache_key,
+    iter_evaluations,
+    extract_texts,
+    build_chat_request,
+    api_breaker,
+    verdict_resume_key,
+    criterion_hash,
+    evaluation_profile,
+    align_verdicts,
+    missing_criteria,
+    merge_evaluation,
+    needs_escalation,
+)
+
+
+def requeue_expired_items():
+    """
+    Returns items whose worker died mid-evaluation to the queue, or fails them
+    once they have used up their attempts. Finished items are never touched, so
+    an interrupted job resumes without re-evaluating completed resumes.
+    """
+    now = datetime.utcnow()
+    expired = ScreeningJobItem.query.filter(
+        ScreeningJobItem.status == "running",
+        ScreeningJobItem.lease_expires_at < now,
+    )
+    expired.filter(ScreeningJobItem.attempts >= app.config["JOB_MAX_ATTEMPTS"]).update(
+        {"status": "failed", "error": "Worker lease expired too many times."},
+        synchronize_session=False,
+    )
+    expired.update(
+        {"status": "pending", "claimed_by": None, "lease_expires_at": None},
+        synchronize_session=False,
+    )
+    # Batch jobs whose worker died before the batch was submitted
+    ScreeningJob.query.filter(
+        ScreeningJob.status == "batch_preparing",
+        ScreeningJob.lease_expires_at < now,
+    ).update({"status": "queued", "lease_expires_at": None}, synchronize_session=False)
+    db.session.commit()
+
+
+def claim_items(worker_id, limit):
+    """
+    Atomically claims up to `limit` pending items for this worker.
+
+    Args:
+        worker_id (str): Unique ID of the claiming worker.
+        limit (int): Maximum number of items to claim.
+
+    Returns:
+        list: The claimed ScreeningJobItem rows, oldest jobs first.
+    """
+    lead_item = db.aliased(ScreeningJobItem)
+    pending_ids = [
+        item_id
+        for (item_id,) in db.session.query(ScreeningJobItem.id)
+        .join(ScreeningJob)
+        .filter(
+            ScreeningJobItem.status == "pending",
+            # Requeued items back off before their next attempt
+            db.or_(
+                ScreeningJobItem.not_before.is_(None),
+                ScreeningJobItem.not_before <= datetime.utcnow(),
+            ),
+            # Items wait until their job's pre-screening has picked the shortlist
+            ScreeningJob.status != "prefilter",
+            # Batch jobs are handled by submit_batch_jobs
+            ScreeningJob.mode == "sync",
+            # Follower items are screened along with their lead item, and
+            # only claimed on their own if that didn't happen
+            db.or_(
+                ScreeningJob.lead_job_id.is_(None),
+                db.exists().where(
+                    lead_item.job_id == ScreeningJob.lead_job_id,
+                    lead_item.seq == ScreeningJobItem.seq,
+                    lead_item.status.notin_(["pending", "running", "batched"]),
+                ),
+            ),
+        )
+        .order_by(ScreeningJobItem.job_id, ScreeningJobItem.seq)
+        .limit(limit)
+    ]
+    if not pending_ids:
+        return []
+
+    # The status guard makes the claim safe when several workers race for rows
+    ScreeningJobItem.query.filter(
+        ScreeningJobItem.id.in_(pending_ids), ScreeningJobItem.status == "pending"
+    ).update(
+        {
+            "status": "running",
+            "claimed_by": worker_id,
+            "lease_expires_at": datetime.utcnow()
+            + timedelta(seconds=app.config["JOB_LEASE_SECONDS"]),
+            "attempts": ScreeningJobItem.attempts + 1,
+        },
+        synchronize_session=False,
+    )
+    ScreeningJob.query.filter(
+        ScreeningJob.id.in_(
+            db.session.query(ScreeningJobItem.job_id).filter(
+                ScreeningJobItem.claimed_by == worker_id
+            )
+        ),
+        ScreeningJob.status == "queued",
+    ).update({"status": "running"}, synchronize_session=False)
+    db.session.commit()
+
+    # Only the rows this call claimed; other workers may have won some
+    return (
+        ScreeningJobItem.query.filter(
+            ScreeningJobItem.id.in_(pending_ids),
+            ScreeningJobItem.claimed_by == worker_id,
+            ScreeningJobItem.status == "running",
+        )
+        .options(db.undefer(ScreeningJobItem.pdf_data))
+        .order_by(ScreeningJobItem.job_id, ScreeningJobItem.seq)
+        .all()
+    )
+
+
+def extract_missing_texts(items):
+    """
+    Extracts and stores the text of items that have not been extracted yet,
+    failing items whose PDF cannot be read.
+
+    Args:
+        items (list): ScreeningJobItem rows of the same job.
+    """
+    missing = [item for item in items if item.resume_text is None]
+    if not missing:
+        return
+    with StageTimer("extract", items=len(missing)) as timer:
+        extracted = extract_texts(
+            [item.pdf_data for item in missing],
+            max_pages=app.config["MAX_PDF_PAGES"],
+            max_chars=app.config["MAX_RESUME_CHARS"],
+            max_workers=app.config["EXTRACTION_WORKERS"],
+        )
+    record_stage_time(missing[0].job_id, "extract", timer.seconds)
+    for item, (resume_text, error) in zip(missing, extracted):
+        if error is not None:
+            item.status = "failed"
+            item.error = f"Could not read PDF: {error}"
+        else:
+            item.resume_text = resume_text
+    db.session.commit()
+
+
+def prefilter_jobs():
+    """
+    Runs lexical pre-screening for jobs whose position has it enabled.
+
+    Every resume in the job is ranked with BM25 against the position's
+    criteria and only the shortlist is left pending for evaluation. The step
+    is deterministic, so a job interrupted here is simply pre-screened again.
+    """
+    for job in ScreeningJob.query.filter_by(status="prefilter").all():
+        spec = get_position_spec(job.position_id)
+        pending = [item for item in job.items if item.status == "pending"]
+        extract_missing_texts(pending)
+        pending = [item for item in pending if item.status == "pending"]
+
+        if pending and spec is not None:
+            scores = rank_resumes([item.resume_text for item in pending], spec.criteria)
+            keep = shortlist(
+                scores,
+                top_k=spec.prefilter_top_k,
+                min_score=spec.prefilter_min_score,
+            )
+            for item, score, kept in zip(pending, scores, keep):
+                item.prefilter_score = round(float(score), 4)
+                if not kept:
+                    item.status = "filtered"
+            job.prefilter_skipped = int((~keep).sum())
+
+        job.status = "queued"
+        db.session.commit()
+
+
+def record_usage(job_id, usage, escalated=False):
+    """
+    Adds the token counts of one API call to the job's running totals.
+
+    Args:
+        job_id (int): ID of the job the call was made for.
+        usage (dict): Token counts from check_requirements, or None.
+        escalated (bool): Whether the call went to the cascade's stronger
+            model, which is also counted separately.
+    """
+    if not usage:
+        return
+    values = {
+        "prompt_tokens": ScreeningJob.prompt_tokens + usage["prompt_tokens"],
+        "completion_tokens": ScreeningJob.completion_tokens
+        + usage["completion_tokens"],
+        "cached_tokens": ScreeningJob.cached_tokens + usage["cached_tokens"],
+        "api_calls": ScreeningJob.api_calls + 1,
+        # Batch results come without a per-request latency
+        "api_seconds": ScreeningJob.api_seconds + usage.get("seconds", 0),
+    }
+    if escalated:
+        values.update(
+            {
+                "escalated_prompt_tokens": ScreeningJob.escalated_prompt_tokens
+                + usage["prompt_tokens"],
+                "escalated_completion_tokens": ScreeningJob.escalated_completion_tokens
+                + usage["completion_tokens"],
+                "escalated_cached_tokens": ScreeningJob.escalated_cached_tokens
+                + usage["cached_tokens"],
+                "escalated_calls": ScreeningJob.escalated_calls + 1,
+                "escalated_seconds": ScreeningJob.escalated_seconds
+                + usage.get("seconds", 0),
+            }
+        )
+    # Incremented in SQL so concurrent workers on the same job don't clobber
+    ScreeningJob.query.filter_by(id=job_id).update(values, synchronize_session=False)
+
+
+def prepare_resumes(items):
+    """
+    Extracts, compacts and preprocesses the text of claimed items.
+
+    Args:
+        items (list): ScreeningJobItem rows with status "running".
+
+    Returns:
+        dict: Mapping of item ID to preprocessed resume data, for every item
+            whose PDF could be read.
+    """
+    extract_missing_texts(items)
+    resumes = {}
+    with StageTimer("preprocess") as timer:
+        for item in items:
+            if item.status != "running":
+                continue
+            resume_text, token_counts = compact_resume(
+                item.resume_text, token_budget=app.config["RESUME_TOKEN_BUDGET"]
+            )
+            item.tokens_before = token_counts["tokens_before"]
+            item.tokens_after = token_counts["tokens_after"]
+            resumes[item.id] = preprocess_resume(resume_text)
+        timer.items = len(resumes)
+    if items:
+        record_stage_time(items[0].job_id, "preprocess", timer.seconds)
+    db.session.commit()
+    return resumes
+
+
+def save_result(item, result):
+    if result.get("circuit_open"):
+        # The breaker refused the call, so the API never saw this resume; give
+        # the attempt back and retry once the breaker lets calls through again
+        item.status = "pending"
+        item.claimed_by = None
+        item.attempts -= 1
+        item.error = result["error"]
+        item.not_before = datetime.utcnow() + timedelta(
+            seconds=api_breaker.reset_timeout
+        )
+    elif result.get("retryable") and item.attempts < app.config["JOB_MAX_ATTEMPTS"]:
+        # Transient API trouble; put the resume back in the queue
+        item.status = "pending"
+        item.claimed_by = None
+        item.error = result["error"]
+        item.not_before = datetime.utcnow() + timedelta(
+            seconds=app.config["JOB_RETRY_BACKOFF_SECONDS"]
+            * 2 ** max(item.attempts - 1, 0)
+        )
+    elif "error" in result:
+        item.status = "failed"
+        item.error = result["error"]
+    else:
+        item.status = "done"
+        item.result = json.dumps(result)
+    item.lease_expires_at = None
+
+
+def mark_duplicates(items, resumes):
+    """
+    Flags items whose resume duplicates another resume of the same job.
+
+    Each item is compared with the job's earlier finished, non-duplicate
+    items and with the items before it in `items`.
+
+    Args:
+        items (list): ScreeningJobItem rows belonging to the same job.
+        resumes (dict): Preprocessed resume data by item ID.
+
+    Returns:
+        dict: Mapping of duplicate item ID to its canonical ScreeningJobItem.
+    """
+    detector = DuplicateDetector()
+    earlier = ScreeningJobItem.query.filter(
+        ScreeningJobItem.job_id == items[0].job_id,
+        ScreeningJobItem.status == "done",
+        ScreeningJobItem.duplicate_of_id.is_(None),
+        ScreeningJobItem.content_hash.isnot(None),
+        ScreeningJobItem.id.notin_([item.id for item in items]),
+    ).order_by(ScreeningJobItem.seq)
+    for item in earlier:
+        signature = (
+            np.frombuffer(item.minhash, dtype=np.uint64) if item.minhash else None
+        )
+        detector.add(item, item.content_hash, item.email, signature)
+
+    duplicates = {}
+    for item in items:
+        resume_data = resumes.get(item.id)
+        if resume_data is None:
+            continue
+        signature = detector.signature(resume_data["resume_text"])
+        item.content_hash = content_hash(resume_data["resume_text"])
+        item.email = normalize_email(resume_data["email"])
+        item.minhash = signature.tobytes() if signature is not None else None
+        match = detector.match(item.content_hash, item.email, signature)
+        if match is None:
+            item.duplicate_of, item.duplicate_reason = None, None
+            detector.add(item, item.content_hash, item.email, signature)
+        else:
+            item.duplicate_of, item.duplicate_reason = match
+            duplicates[item.id] = item.duplicate_of
+    db.session.commit()
+    return duplicates
+
+
+def evaluation_keys(spec, resumes, duplicates, model=None):
+    """
+    Computes the evaluation cache key of every resume that needs a result.
+
+    Duplicates share the key of a canonical copy in `resumes`, so they are
+    answered by its evaluation. Duplicates of an earlier finished item get
+    no key; they take that item's result as is.
+
+    Args:
+        model (str, optional): Model the results come from; defaults to the
+            position's evaluation_model, which covers its cascade.
+
+    Returns:
+        dict: Mapping of item ID to cache key.
+    """
+    keys = {
+        item_id: evaluation_cache_key(
+            resume_data,
+            spec.min_qualifications,
+            spec.pref_qualifications,
+            spec.added_value,
+            model=model or spec.evaluation_model,
+        )
+        for item_id, resume_data in resumes.items()
+        if item_id not in duplicates
+    }
+    for item_id, canonical in duplicates.items():
+        if canonical.id in keys:
+            keys[item_id] = keys[canonical.id]
+    return keys
+
+
+def reuse_earlier_results(run, items, cache_keys):
+    """
+    Gives duplicates of earlier finished items their canonical's result.
+    """
+    reused = []
+    for item in items:
+        if item.duplicate_of is not None and item.id not in cache_keys:
+            save_result(item, json.loads(item.duplicate_of.result))
+            reused.append(item)
+    save_candidate_results(run, reused)
+    db.session.commit()
+
+
+def fail_deleted_position(items):
+    for item in items:
+        save_result(item, {"error": "The position was deleted."})
+    db.session.commit()
+
+
+def process_items(items):
+    """
+    Screens claimed items of a single job and stores their evaluations.
+
+    When the job leads a multi-position screening, the matching items of
+    its followers are screened in the same pass, from the same extracted
+    text and, where the criteria fit, the same evaluation calls.
+
+    Args:
+        items (list): ScreeningJobItem rows belonging to the same job.
+    """
+    job = items[0].job
+    spec = get_position_spec(job.position_id)
+    if spec is None:
+        fail_deleted_position(items)
+        return
+    if job.lead_job_id is not None:
+        copy_lead_texts(items)
+    resumes = prepare_resumes(items)
+    duplicates = mark_duplicates(items, resumes)
+    followers = [
+        (follower, get_position_spec(follower.position_id))
+        for follower in job.followers
+    ]
+    also_ask = combined_criteria(
+        spec, [follower_spec for _, follower_spec in followers if follower_spec]
+    )
+    screen_items(items, spec, resumes, duplicates, also_ask)
+
+    for follower, follower_spec in followers:
+        follower_items = claim_follower_items(follower.id, items)
+        if not follower_items:
+            continue
+        if follower_spec is None:
+            fail_deleted_position(follower_items)
+            continue
+        follower_resumes, follower_duplicates = share_lead_items(
+            items, follower_items, resumes
+        )
+        screen_items(
+            follower_items, follower_spec, follower_resumes, follower_duplicates
+        )
+
+
+def screen_items(items, spec, resumes, duplicates, also_ask=((), (), ())):
+    """
+    Evaluates prepared items of one job, reusing cached evaluations and
+    stored verdicts, and saves their results.
+
+    Args:
+        items (list): ScreeningJobItem rows belonging to the same job.
+        spec (PositionSpec): The job's position.
+        resumes (dict): Preprocessed resume data by item ID.
+        duplicates (dict): Canonical item of each duplicate, by item ID.
+        also_ask (tuple): Extra minimum, preferred and added-value criteria
+            to include in the evaluation calls, see combined_criteria.
+    """
+    cache_keys = evaluation_keys(spec, resumes, duplicates)
+    run = items[0].job.run
+    reuse_earlier_results(run, items, cache_keys)
+    cached_results = get_cached_evaluations(list(cache_keys.values()))
+
+    def record(key, result):
+        finished = []
+        for item in items:
+            if cache_keys.get(item.id) == key:
+                save_result(item, result)
+                finished.append(item)
+        save_candidate_results(
+            run, [item for item in finished if item.status == "done"]
+        )
+        db.session.commit()
+
+    for key, result in cached_results.items():
+        record(key, result)
+
+    # Only evaluate each distinct uncached resume once, and publish every
+    # result as soon as it arrives so the results page can stream it
+    pending = {}
+    for item_id, key in cache_keys.items():
+        if key not in cached_results:
+            pending.setdefault(key, resumes[item_id])
+    evaluate_pending(items[0].job_id, spec, pending, record, also_ask)
+
+
+def combined_criteria(spec, follower_specs):
+    """
+    Picks the criteria of follower positions to ask about in the lead
+    position's evaluation calls, so one call per resume covers them all.
+
+    Followers are added in order while their new criteria fit in
+    CRITERIA_TOKEN_BUDGET, counting the lead's own criteria; the verdicts
+    are stored per criterion, so followers left out are simply asked about
+    their remaining criteria when their items are screened.
+
+    Args:
+        spec (PositionSpec): The lead position.
+        follower_specs (list): The follower positions.
+
+    Returns:
+        tuple: Extra minimum, preferred and added-value criteria.
+    """
+    lead_lists = (spec.min_qualifications, spec.pref_qualifications, spec.added_value)
+    criteria = [q for qualifications in lead_lists for q in qualifications]
+    seen = {criterion_hash(q) for q in criteria}
+    tokens = count_tokens("\n".join(criteria))
+    extra = ([], [], [])
+    for follower_spec in follower_specs:
+        new, new_hashes = ([], [], []), set()
+        for qualifications, added in zip(
+            (
+                follower_spec.min_qualifications,
+                follower_spec.pref_qualifications,
+                follower_spec.added_value,
+            ),
+            new,
+        ):
+            for q in qualifications:
+                hashed = criterion_hash(q)
+                if hashed not in seen and hashed not in new_hashes:
+                    new_hashes.add(hashed)
+                    added.append(q)
+        cost = count_tokens("\n".join(q for added in new for q in added))
+        if tokens + cost > app.config["CRITERIA_TOKEN_BUDGET"]:
+            continue
+        tokens += cost
+        seen |= new_hashes
+        for qualifications, added in zip(extra, new):
+            qualifications.extend(added)
+    return tuple(tuple(qualifications) for qualifications in extra)
+
+
+def copy_lead_texts(items):
+    """
+    Fills in the text of follower items claimed on their own, from the
+    lead job's items, since follower items store no PDF.
+
+    Args:
+        items (list): ScreeningJobItem rows of the same follower job.
+    """
+    lead_texts = dict(
+        db.session.query(ScreeningJobItem.seq, ScreeningJobItem.resume_text).filter(
+            ScreeningJobItem.job_id == items[0].job.lead_job_id,
+            ScreeningJobItem.seq.in_([item.seq for item in items]),
+        )
+    )
+    for item in items:
+        if item.resume_text is None:
+            item.resume_text = lead_texts.get(item.seq)
+            if item.resume_text is None:
+                item.status = "failed"
+                item.error = "The resume could not be read."
+    db.session.commit()
+
+
+def claim_follower_items(follower_id, lead_items):
+    """
+    Claims the pending items of a follower job that match lead items which
+    just finished.
+
+    Args:
+        follower_id (int): ID of the follower job.
+        lead_items (list): The lead job's items screened in this pass.
+
+    Returns:
+        list: The claimed ScreeningJobItem rows.
+    """
+    seqs = [item.seq for item in lead_items if item.status in ("done", "failed")]
+    if not seqs:
+        return []
+    worker_id = lead_items[0].claimed_by
+    claimed = ScreeningJobItem.query.filter(
+        ScreeningJobItem.job_id == follower_id,
+        ScreeningJobItem.seq.in_(seqs),
+        ScreeningJobItem.status == "pending",
+    ).update(
+        {
+            "status": "running",
+            "claimed_by": worker_id,
+            "lease_expires_at": datetime.utcnow()
+            + timedelta(seconds=app.config["JOB_LEASE_SECONDS"]),
+            "attempts": ScreeningJobItem.attempts + 1,
+        },
+        synchronize_session=False,
+    )
+    if claimed:
+        ScreeningJob.query.filter_by(id=follower_id, status="queued").update(
+            {"status": "running"}, synchronize_session=False
+        )
+    db.session.commit()
+    return (
+        ScreeningJobItem.query.filter(
+            ScreeningJobItem.job_id == follower_id,
+            ScreeningJobItem.seq.in_(seqs),
+            ScreeningJobItem.claimed_by == worker_id,
+            ScreeningJobItem.status == "running",
+        )
+        .order_by(ScreeningJobItem.seq)
+        .all()
+    )
+
+
+def share_lead_items(lead_items, follower_items, resumes):
+    """
+    Gives follower items the prepared text and duplicate flags of the lead
+    items with the same position in the upload, instead of extracting,
+    compacting and comparing the resumes again.
+
+    Args:
+        lead_items (list): The lead job's items screened in this pass.
+        follower_items (list): The matching items of one follower job.
+        resumes (dict): Preprocessed resume data by lead item ID.
+
+    Returns:
+        tuple: (preprocessed resume data by follower item ID, canonical
+            item of each duplicate by follower item ID).
+    """
+    lead_by_seq = {item.seq: item for item in lead_items}
+    follower_by_seq = {item.seq: item for item in follower_items}
+    follower_resumes = {}
+    duplicates = {}
+    for item in follower_items:
+        lead = lead_by_seq[item.seq]
+        if lead.id not in resumes:
+            save_result(item, {"error": lead.error or "The resume could not be read."})
+            continue
+        follower_resumes[item.id] = resumes[lead.id]
+        item.resume_text = lead.resume_text
+        item.tokens_before, item.tokens_after = lead.tokens_before, lead.tokens_after
+        item.content_hash, item.email = lead.content_hash, lead.email
+        item.minhash = lead.minhash
+        if lead.duplicate_of is None:
+            continue
+        canonical = follower_by_seq.get(lead.duplicate_of.seq)
+        if canonical is None:
+            canonical = ScreeningJobItem.query.filter_by(
+                job_id=item.job_id, seq=lead.duplicate_of.seq, status="done"
+            ).first()
+        if canonical is not None:
+            item.duplicate_of, item.duplicate_reason = canonical, lead.duplicate_reason
+            duplicates[item.id] = canonical
+    db.session.commit()
+    return follower_resumes, duplicates
+
+
+def evaluate_pending(job_id, spec, pending, record, also_ask=((), (), ())):
+    """
+    Evaluates resumes that have no cached evaluation.
+
+    Verdicts stored by earlier screenings are reused, so a resume is only
+    asked about the criteria it hasn't been judged on, e.g. the one an admin
+    just edited. With a model cascade, borderline results, whether freshly
+    answered or put together from stored verdicts, then go to the stronger
+    model, which reuses its own stored verdicts the same way.
+
+    Args:
+        job_id (int): ID of the job the resumes belong to.
+        spec (PositionSpec): The position's compiled spec.
+        pending (dict): Mapping of evaluation cache key to resume data.
+        record (callable): Called with (cache key, result) for every result.
+        also_ask (tuple): Extra criteria to ask about in the same calls; their
+            verdicts are only stored, for other positions to reuse.
+    """
+    qualification_lists = (
+        spec.min_qualifications,
+        spec.pref_qualifications,
+        spec.added_value,
+    )
+    asked_lists = tuple(
+        qualifications + extra
+        for qualifications, extra in zip(qualification_lists, also_ask)
+    )
+    resume_hashes = {
+        key: content_hash(resume_data["resume_text"])
+        for key, resume_data in pending.items()
+    }
+    resume_keys = {
+        key: verdict_resume_key(resume_hash)
+        for key, resume_hash in resume_hashes.items()
+    }
+    stored = get_stored_verdicts(list(resume_keys.values()))
+
+    def finish(key, result):
+        store_evaluations({key: result})
+        record(key, result)
+
+    # First answers of resumes the cascade sends on to the stronger model
+    borderline = {}
+
+    def finish_or_escalate(key, result):
+        if spec.cascade_enabled and needs_escalation(
+            result,
+            spec.qualification_score,
+            spec.cascade_cutoff,
+            spec.cascade_band,
+        ):
+            borderline[key] = result
+        else:
+            finish(key, result)
+
+    # Resumes needing the same criteria share a prompt, and so its cached prefix
+    groups = {}
+    reused = 0
+    for key in pending:
+        profile, verdicts = stored.get(resume_keys[key], (None, {}))
+        missing = asked_lists
+        if profile is not None:
+            missing = missing_criteria(asked_lists, verdicts)
+            reused += sum(map(len, qualification_lists)) - sum(
+                map(len, missing_criteria(qualification_lists, verdicts))
+            )
+        if any(missing):
+            groups.setdefault(missing, []).append(key)
+        else:
+            finish_or_escalate(
+                key, merge_evaluation(profile, qualification_lists, verdicts)
+            )
+    if reused:
+        ScreeningJob.query.filter_by(id=job_id).update(
+            {"reused_verdicts": ScreeningJob.reused_verdicts + reused},
+            synchronize_session=False,
+        )
+        db.session.commit()
+
+    # Wall-clock time spent waiting for answers; saving them counts as scoring
+    started = time.perf_counter()
+    saving_seconds = 0.0
+    for missing, keys in groups.items():
+        for index, result in iter_evaluations(
+            [pending[key] for key in keys],
+            *missing,
+            max_workers=app.config["MAX_CONCURRENT_EVALUATIONS"],
+            instructions=spec.instructions if missing == qualification_lists else None,
+        ):
+            saving_started = time.perf_counter()
+            key = keys[index]
+            record_usage(job_id, result.pop("usage", None))
+            if "error" not in result:
+                profile = evaluation_profile(result)
+                verdicts = align_verdicts(result, missing)
+                store_verdicts(resume_keys[key], profile, verdicts)
+                verdicts = {**stored.get(resume_keys[key], (None, {}))[1], **verdicts}
+                result = merge_evaluation(profile, qualification_lists, verdicts)
+            finish_or_escalate(key, result)
+            saving_seconds += time.perf_counter() - saving_started
+    # Don't hold the usage updates of escalated resumes open during their calls
+    db.session.commit()
+
+    # The stronger model's verdicts are filed under its own name, so they
+    # never pass for the first model's. Every criterion is judged by it, so
+    # the whole score comes from one model.
+    strong_keys = {
+        key: verdict_resume_key(resume_hashes[key], model=spec.cascade_model)
+        for key in borderline
+    }
+    strong_stored = get_stored_verdicts(list(strong_keys.values()))
+    strong_groups = {}
+    for key in borderline:
+        profile, verdicts = strong_stored.get(strong_keys[key], (None, {}))
+        missing = asked_lists
+        if profile is not None:
+            missing = missing_criteria(asked_lists, verdicts)
+        if any(missing):
+            strong_groups.setdefault(missing, []).append(key)
+        else:
+            finish(key, merge_evaluation(profile, qualification_lists, verdicts))
+    for missing, keys in strong_groups.items():
+        for index, result in iter_evaluations(
+            [pending[key] for key in keys],
+            *missing,
+            max_workers=app.config["MAX_CONCURRENT_EVALUATIONS"],
+            instructions=spec.instructions if missing == qualification_lists else None,
+            model=spec.cascade_model,
+        ):
+            saving_started = time.perf_counter()
+            key = keys[index]
+            record_usage(job_id, result.pop("usage", None), escalated=True)
+            if "error" not in result:
+                profile = evaluation_profile(result)
+                verdicts = align_verdicts(result, missing)
+                store_verdicts(strong_keys[key], profile, verdicts)
+                verdicts = {
+                    **strong_stored.get(strong_keys[key], (None, {}))[1],
+                    **verdicts,
+                }
+                result = merge_evaluation(profile, qualification_lists, verdicts)
+            elif "error" not in borderline[key]:
+                # A borderline first answer beats failing the resume
+                result = borderline[key]
+            finish(key, result)
+            saving_seconds += time.perf_counter() - saving_started
+    if groups or strong_groups:
+        evaluate_seconds = time.perf_counter() - started - saving_seconds
+        observe_stage(
+            "evaluate",
+            evaluate_seconds,
+            items=len(set().union(*groups.values(), *strong_groups.values())),
+        )
+        record_stage_time(job_id, "evaluate", evaluate_seconds)
+        db.session.commit()
+
+
+def submit_batch_jobs(worker_id, batch_client):
+    """
+    Sends queued batch-mode jobs to the Batch API.
+
+    Cached evaluations are applied straight away. The remaining resumes are
+    written to one JSONL file per job and submitted as a single batch.
+
+    Args:
+        worker_id (str): Unique ID of this worker.
+        batch_client: OpenAI client or LocalBatchClient.
+    """
+    for (job_id,) in db.session.query(ScreeningJob.id).filter_by(
+        mode="batch", status="queued"
+    ):
+        lease_expires_at = datetime.utcnow() + timedelta(
+            seconds=app.config["JOB_LEASE_SECONDS"]
+        )
+        claimed = ScreeningJob.query.filter_by(id=job_id, status="queued").update(
+            {"status": "batch_preparing", "lease_expires_at": lease_expires_at},
+            synchronize_session=False,
+        )
+        ScreeningJobItem.query.filter_by(job_id=job_id, status="pending").update(
+            {
+                "status": "running",
+                "claimed_by": worker_id,
+                "lease_expires_at": lease_expires_at,
+                "attempts": ScreeningJobItem.attempts + 1,
+            },
+            synchronize_session=False,
+        )
+        db.session.commit()
+        if not claimed:
+            continue
+
+        job = ScreeningJob.query.get(job_id)
+        items = [item for item in job.items if item.status == "running"]
+        spec = get_position_spec(job.position_id)
+        if spec is None:
+            fail_deleted_position(items)
+            job.status = "running"
+            job.lease_expires_at = None
+            db.session.commit()
+            continue
+        resumes = prepare_resumes(items)
+        duplicates = mark_duplicates(items, resumes)
+        # The Batch API answers with the first model only, without a cascade
+        cache_keys = evaluation_keys(spec, resumes, duplicates, model=MODEL_NAME)
+        reuse_earlier_results(job.run, items, cache_keys)
+        cached_results = get_cached_evaluations(list(cache_keys.values()))
+
+        requests = {}
+        cached_items = []
+        for item in items:
+            if item.id not in cache_keys:
+                continue
+            if cache_keys[item.id] in cached_results:
+                save_result(item, cached_results[cache_keys[item.id]])
+                cached_items.append(item)
+                continue
+            # Duplicates wait for their canonical copy's answer instead
+            if item.id not in duplicates:
+                requests[item.id] = build_chat_request(
+                    resumes[item.id], spec.instructions
+                )
+                item.cache_key = cache_keys[item.id]
+            # The batch may take hours; release the item so neither the lease
+            # nor this worker's next claim picks it up again
+            item.status = "batched"
+            item.claimed_by = None
+            item.lease_expires_at = None
+        save_candidate_results(job.run, cached_items)
+
+        if requests:
+            path = os.path.join(app.config["BATCH_FILE_DIR"], f"job-{job.id}.jsonl")
+            write_batch_file(path, requests)
+            job.batch_id = submit_batch(batch_client, path)
+            job.status = "batch_submitted"
+        else:
+            job.status = "running"
+        job.lease_expires_at = None
+        db.session.commit()
+
+
+def poll_batch_jobs(batch_client):
+    """
+    Checks submitted batches and ingests the output of finished ones.
+
+    Args:
+        batch_client: OpenAI client or LocalBatchClient.
+    """
+    for job in ScreeningJob.query.filter_by(status="batch_submitted").all():
+        batch = batch_client.batches.retrieve(job.batch_id)
+        if batch.status not in ("completed", "failed", "expired", "cancelled"):
+            continue
+
+        results = {}
+        if batch.status == "completed":
+            results = read_batch_results(batch_client, batch)
+
+        batched = [item for item in job.items if item.status == "batched"]
+        for item in batched:
+            result = results.get(
+                str(item.duplicate_of_id or item.id),
+                {"error": f"No result returned by batch ({batch.status})."},
+            )
+            record_usage(job.id, result.pop("usage", None))
+            if "error" not in result and item.cache_key:
+                store_evaluations({item.cache_key: result})
+                # The position may have been edited since the batch was sent,
+                # so verdicts are filed under the criteria the model answered
+                store_verdicts(
+                    verdict_resume_key(item.content_hash),
+                    evaluation_profile(result),
+                    align_verdicts(result),
+                )
+            save_result(item, result)
+        save_candidate_results(
+            job.run, [item for item in batched if item.status == "done"]
+        )
+        job.status = "running"
+        db.session.commit()
+
+
+def finalize_jobs():
+    """
+    Marks jobs whose items have all finished as done, or as failed when no
+    resume could be screened.
+    """
+    open_jobs = ScreeningJob.query.filter(
+        ScreeningJob.status.in_(["queued", "running"])
+    ).all()
+    for job in open_jobs:
+        statuses = [item.status for item in job.items]
+        if "pending" in statuses or "running" in statuses or "batched" in statuses:
+            continue
+
+        job.status = "done" if job.run.candidates.count() else "failed"
+        job.finished_at = datetime.utcnow()
+        db.session.commit()
+
+
+def release_items(item_ids, error):
+    """
+    Returns claimed items to the queue after an unexpected error, or fails
+    them once they have used up their attempts, so one bad resume can't
+    keep crashing the workers.
+
+    Args:
+        item_ids (list): IDs of the items the failed work had claimed.
+        error (str): Message saved on the items.
+    """
+    db.session.rollback()
+    items = ScreeningJobItem.query.filter(
+        ScreeningJobItem.id.in_(item_ids), ScreeningJobItem.status == "running"
+    )
+    for item in items:
+        save_result(item, {"error": error, "retryable": True})
+    db.session.commit()
+
+
+def run_worker(poll_interval=2.0):
+    """
+    Drains the screening queue until interrupted.
+
+    Errors are logged and the loop keeps polling; the items being screened
+    go back to the queue, up to JOB_MAX_ATTEMPTS times.
+
+    Args:
+        poll_interval (float): Seconds to sleep when the queue is empty.
+    """
+    worker_id = uuid.uuid4().hex
+    last_batch_poll = 0.0
+    with app.app_context():
+        batch_client = get_batch_client(app.config["BATCH_LOCAL_DIR"])
+        while True:
+            try:
+                requeue_expired_items()
+                prefilter_jobs()
+                submit_batch_jobs(worker_id, batch_client)
+                if (
+                    time.monotonic() - last_batch_poll
+                    > app.config["BATCH_POLL_SECONDS"]
+                ):
+                    last_batch_poll = time.monotonic()
+                    poll_batch_jobs(batch_client)
+
+                items = []
+                # Leave the queue alone while the API keeps failing
+                if not api_breaker.is_open:
+                    items = claim_items(worker_id, app.config["JOB_CLAIM_BATCH_SIZE"])
+                if not items:
+                    finalize_jobs()
+                    time.sleep(poll_interval)
+                    continue
+
+                for job_id in dict.fromkeys(item.job_id for item in items):
+                    job_items = [item for item in items if item.job_id == job_id]
+                    item_ids = [item.id for item in job_items]
+                    try:
+                        process_items(job_items)
+                    except Exception as e:
+                        print(f"Screening items {item_ids} of job {job_id} failed:")
+                        traceback.print_exc()
+                        release_items(item_ids, f"Unexpected error: {e}")
+                finalize_jobs()
+                evict_evaluation_cache()
+            except Exception:
+                # e.g. the database being unavailable; try again later
+                print("Worker pass failed:")
+                traceback.print_exc()
+                db.session.rollback()
+                time.sleep(poll_interval)
+
+
+if __name__ == "__main__":
+    run_worker()